@@ -2,21 +2,27 @@
 """
 This module contains the wait_random coroutine.
 """
+from typing import Awaitable, Callable, Optional
 import asyncio
 import random
 
+Sleep = Callable[[float], Awaitable[None]]
 
-async def wait_random(max_delay: int = 10) -> float:
+
+async def wait_random(max_delay: int = 10,
+                      sleep: Optional[Sleep] = None) -> float:
     """
     Wait for a random delay between 0 and max_delay (included and float value)
     seconds and eventually return the delay.
 
     Args:
         max_delay (int): The maximum number of seconds to wait. Default is 10.
+        sleep (Sleep): The coroutine function used to wait, such as
+            TimerWheel.sleep. Default is None, which uses asyncio.sleep.
 
     Returns:
         float: The amount of time waited.
     """
     delay = random.uniform(0, max_delay)
-    await asyncio.sleep(delay)
+    await (sleep or asyncio.sleep)(delay)
     return delay
@@ -2,24 +2,49 @@
 """
 This module contains the wait_n coroutine.
 """
-from typing import List
+from typing import List, Optional
 import asyncio
 import importlib
 # wait_random = __import__('0-basic_async_syntax').wait_random
 wait_random = importlib.import_module('0-basic_async_syntax').wait_random
+Sleep = importlib.import_module('0-basic_async_syntax').Sleep
 
 
-async def wait_n(n: int, max_delay: int) -> List[float]:
+async def wait_n(n: int, max_delay: int,
+                 concurrency: Optional[int] = None,
+                 sleep: Optional[Sleep] = None) -> List[float]:
     """
     Spawn wait_random n times with the specified max_delay and return the list
     of all the delays in ascending order.
 
+    With concurrency, only that many workers are created; each one runs
+    wait_random again until n calls have been made, so at most concurrency
+    coroutines are in flight at any time, however large n is.
+
     Args:
         n (int): The number of times to spawn wait_random.
         max_delay (int): The maximum number of seconds to wait.
+        concurrency (int): The maximum number of wait_random calls in
+            flight. Default is None, which runs all n at once.
+        sleep (Sleep): Passed on to wait_random. Default is None.
 
     Returns:
         List[float]: List of all the delays in ascending order.
     """
-    delays = await asyncio.gather(*(wait_random(max_delay) for _ in range(n)))
+    if concurrency is None:
+        delays = await asyncio.gather(
+            *(wait_random(max_delay, sleep) for _ in range(n)))
+        return sorted(delays)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    calls = iter(range(n))
+    delays = []
+
+    async def worker() -> None:
+        """Run wait_random until no calls are left."""
+        for _ in calls:
+            delays.append(await wait_random(max_delay, sleep))
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, n))))
     return sorted(delays)
@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 """
 This module contains the measure_time function.
+
+measure_time runs on the default asyncio event loop, or on any loop of
+EVENT_LOOPS (see event_loops.py), which includes uvloop when it is
+installed. It times a single run; see 7-benchmark.py for repeated,
+statistically summarized runs.
 """
+from typing import Dict
 import time
-import asyncio
+from event_loops import EVENT_LOOPS, run
 wait_n = __import__('1-concurrent_coroutines').wait_n
 
 
-def measure_time(n: int, max_delay: int) -> float:
+def measure_time(n: int, max_delay: int, loop: str = "asyncio") -> float:
     """
     Measure the total execution time for wait_n(n, max_delay),
     and return total_time / n.
@@ -15,12 +21,28 @@ def measure_time(n: int, max_delay: int) -> float:
     Args:
         n (int): The number of times to spawn wait_random.
         max_delay (int): The maximum number of seconds to wait.
+        loop (str): The event loop to run on, a key of EVENT_LOOPS.
+            Default is "asyncio".
 
     Returns:
         float: The average time per call.
     """
-    start_time = time.time()
-    asyncio.run(wait_n(n, max_delay))
-    end_time = time.time()
+    start_time = time.perf_counter()
+    run(wait_n(n, max_delay), loop)
+    end_time = time.perf_counter()
     total_time = end_time - start_time
     return total_time / n
+
+
+def measure_time_per_loop(n: int, max_delay: int) -> Dict[str, float]:
+    """
+    Run measure_time on every available event loop.
+
+    Args:
+        n (int): The number of times to spawn wait_random.
+        max_delay (int): The maximum number of seconds to wait.
+
+    Returns:
+        Dict[str, float]: The average time per call, by event loop.
+    """
+    return {loop: measure_time(n, max_delay, loop) for loop in EVENT_LOOPS}
@@ -2,20 +2,24 @@
 """
 This module contains the task_wait_random function.
 """
+from typing import Optional
 import asyncio
 from importlib import import_module
 
 wait_random = import_module('0-basic_async_syntax').wait_random
+Sleep = import_module('0-basic_async_syntax').Sleep
 
 
-def task_wait_random(max_delay: int) -> asyncio.Task:
+def task_wait_random(max_delay: int,
+                     sleep: Optional[Sleep] = None) -> asyncio.Task:
     """
     Takes an integer max_delay and returns an asyncio.Task.
 
     Args:
         max_delay (int): The maximum number of seconds to wait.
+        sleep (Sleep): Passed on to wait_random. Default is None.
 
     Returns:
         asyncio.Task: A task that waits for a random delay.
     """
-    return asyncio.create_task(wait_random(max_delay))
+    return asyncio.create_task(wait_random(max_delay, sleep))
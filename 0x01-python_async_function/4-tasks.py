@@ -2,26 +2,54 @@
 """
 This module contains the task_wait_n function.
 """
-from typing import List
+from typing import List, Optional
 import asyncio
 from importlib import import_module
 
 task_wait_random = import_module('3-tasks').task_wait_random
+Sleep = import_module('3-tasks').Sleep
 
 
-async def task_wait_n(n: int, max_delay: int) -> List[float]:
+async def task_wait_n(n: int, max_delay: int,
+                      concurrency: Optional[int] = None,
+                      sleep: Optional[Sleep] = None) -> List[float]:
     """
     Spawn task_wait_random n times with the specified max_delay
     and return the list
     of all the delays in ascending order.
 
+    With concurrency, a semaphore gates spawning: each task releases its
+    slot when done, so at most concurrency tasks exist at once and no
+    other tasks are created to run them.
+
     Args:
         n (int): The number of times to spawn task_wait_random.
         max_delay (int): The maximum number of seconds to wait.
+        concurrency (int): The maximum number of tasks in flight.
+            Default is None, which spawns all n tasks up front.
+        sleep (Sleep): Passed on to task_wait_random. Default is None.
 
     Returns:
         List[float]: List of all the delays in ascending order.
     """
-    tasks = [task_wait_random(max_delay) for _ in range(n)]
-    delays = await asyncio.gather(*tasks)
+    if concurrency is None:
+        tasks = [task_wait_random(max_delay, sleep) for _ in range(n)]
+        delays = await asyncio.gather(*tasks)
+        return sorted(delays)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    slots = asyncio.Semaphore(concurrency)
+    tasks: List[asyncio.Task] = []
+    try:
+        for _ in range(n):
+            await slots.acquire()
+            task = task_wait_random(max_delay, sleep)
+            task.add_done_callback(lambda _: slots.release())
+            tasks.append(task)
+        delays = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
     return sorted(delays)
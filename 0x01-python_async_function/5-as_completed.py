@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+This module contains streaming variants of wait_n and task_wait_n.
+"""
+from typing import AsyncIterator, List
+import asyncio
+from importlib import import_module
+
+wait_random = import_module('0-basic_async_syntax').wait_random
+task_wait_random = import_module('3-tasks').task_wait_random
+
+
+def _cancel_pending(tasks: List[asyncio.Future]) -> None:
+    """
+    Cancel the tasks that have not finished yet, so none outlives a
+    caller that stopped iterating early.
+
+    Args:
+        tasks (List[asyncio.Future]): The tasks started by the caller.
+    """
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+
+
+async def wait_n_as_completed(n: int, max_delay: int) -> AsyncIterator[float]:
+    """
+    Spawn wait_random n times with the specified max_delay and yield each
+    delay as soon as its coroutine finishes.
+
+    Args:
+        n (int): The number of times to spawn wait_random.
+        max_delay (int): The maximum number of seconds to wait.
+
+    Yields:
+        float: The delays, in completion order.
+    """
+    tasks = [asyncio.ensure_future(wait_random(max_delay))
+             for _ in range(n)]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:
+        _cancel_pending(tasks)
+
+
+async def task_wait_n_as_completed(n: int,
+                                   max_delay: int) -> AsyncIterator[float]:
+    """
+    Spawn task_wait_random n times with the specified max_delay and yield
+    each delay as soon as its task finishes.
+
+    Args:
+        n (int): The number of times to spawn task_wait_random.
+        max_delay (int): The maximum number of seconds to wait.
+
+    Yields:
+        float: The delays, in completion order.
+    """
+    tasks = [task_wait_random(max_delay) for _ in range(n)]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:
+        _cancel_pending(tasks)
+
+
+async def wait_n_merged(n: int, max_delay: int,
+                        tasks: bool = False) -> List[float]:
+    """
+    Return the delays of wait_n (or task_wait_n when tasks is True) in
+    ascending order.
+
+    Completion order is not delay order: the coroutines start over the
+    first ticks of the loop, and with many of them that spread is far
+    wider than the gap between neighbouring delays. The delays are
+    collected as they arrive and sorted once.
+
+    Args:
+        n (int): The number of times to spawn wait_random.
+        max_delay (int): The maximum number of seconds to wait.
+        tasks (bool): Spawn task_wait_random instead. Default is False.
+
+    Returns:
+        List[float]: List of all the delays in ascending order.
+    """
+    stream = task_wait_n_as_completed if tasks else wait_n_as_completed
+    delays = [delay async for delay in stream(n, max_delay)]
+    delays.sort()
+    return delays
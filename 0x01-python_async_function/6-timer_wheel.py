@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+This module contains the TimerWheel sleep service.
+"""
+from typing import Dict, Optional, Set
+import asyncio
+import math
+
+
+class TimerWheel:
+    """
+    Coalesce many asyncio sleeps into one event-loop timer per tick.
+
+    Wakeup times are rounded up to the next multiple of tick, and every
+    sleeper due in the same tick waits on one timer, so the loop's timer
+    heap holds one handle per busy tick instead of one per sleeper.
+    Sleepers never wake early and wake at most one tick late. A cancelled
+    sleeper leaves its tick, and a tick left empty cancels its timer, so
+    the wheel can move to another loop once its sleepers are gone.
+
+    Pass its sleep method to wait_random, wait_n or task_wait_n:
+
+        wheel = TimerWheel(tick=0.01)
+        delays = await wait_n(100000, 10, sleep=wheel.sleep)
+    """
+
+    def __init__(self, tick: float = 0.01) -> None:
+        """
+        Create a timer wheel.
+
+        Args:
+            tick (float): The wakeup granularity in seconds. Default is 0.01.
+        """
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        self.tick = tick
+        self._slots: Dict[int, Set[asyncio.Future]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def sleep(self, delay: float) -> None:
+        """
+        Sleep for at least delay seconds, waking with the rest of its tick.
+
+        Args:
+            delay (float): The number of seconds to sleep.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._slots:
+                raise RuntimeError("TimerWheel is in use by another loop")
+            self._loop = loop
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+
+        slot = math.ceil((loop.time() + delay) / self.tick)
+        waiters = self._slots.get(slot)
+        if waiters is None:
+            waiters = self._slots[slot] = set()
+            self._timers[slot] = loop.call_at(slot * self.tick,
+                                              self._fire, slot)
+        future = loop.create_future()
+        waiters.add(future)
+        try:
+            await future
+        finally:
+            if future.cancelled():
+                self._leave(slot, future)
+
+    def _leave(self, slot: int, future: asyncio.Future) -> None:
+        """
+        Remove a cancelled sleeper from its tick, and the tick if empty.
+
+        Args:
+            slot (int): The tick of the sleeper.
+            future (asyncio.Future): The future the sleeper waited on.
+        """
+        waiters = self._slots.get(slot)
+        if waiters is None:
+            return
+        waiters.discard(future)
+        if not waiters:
+            del self._slots[slot]
+            self._timers.pop(slot).cancel()
+
+    def _fire(self, slot: int) -> None:
+        """
+        Wake every sleeper of a tick.
+
+        Args:
+            slot (int): The tick that is due.
+        """
+        self._timers.pop(slot, None)
+        for future in self._slots.pop(slot, ()):
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+This module benchmarks wait_n and task_wait_n.
+
+Usage: ./7-benchmark.py [--workload NAME] [-n N] [--max-delay SECONDS]
+                        [--warmup N] [--repeats N] [--loop LOOP|all]
+                        [--lag-interval SECONDS] [--output FILE]
+
+The runs are timed and summarized by loop_benchmark.py.
+"""
+from typing import List, Optional
+import sys
+from importlib import import_module
+import loop_benchmark
+from loop_benchmark import Option, Workloads
+wait_n = import_module('1-concurrent_coroutines').wait_n
+task_wait_n = import_module('4-tasks').task_wait_n
+
+WORKLOADS: Workloads = {
+    "wait_n": lambda args: lambda: wait_n(args.n, args.max_delay),
+    "task_wait_n": lambda args: lambda: task_wait_n(args.n, args.max_delay),
+}
+
+OPTIONS: List[Option] = [
+    (("-n",), {"type": int, "default": 1000,
+               "help": "coroutines spawned per run"}),
+    (("--max-delay",), {"type": float, "default": 0.01,
+                        "help": "maximum delay of each coroutine"}),
+]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (List[str]): The arguments. Default is None, for sys.argv.
+
+    Returns:
+        int: The exit status.
+    """
+    return loop_benchmark.main(argv, WORKLOADS, OPTIONS)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
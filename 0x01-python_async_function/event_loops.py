@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+This module contains the event loops the async projects can run on.
+
+EVENT_LOOPS maps a name to a new-loop factory: the default asyncio loop,
+and uvloop when it is installed. run() is asyncio.run on a loop of any of
+them. The 0x02 project loads this module by file path, so both projects
+share this single copy.
+"""
+from typing import Any, Callable, Coroutine, Dict, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional
+    uvloop = None
+
+EVENT_LOOPS: Dict[str, Callable[[], asyncio.AbstractEventLoop]] = {
+    "asyncio": asyncio.new_event_loop,
+}
+if uvloop is not None:
+    EVENT_LOOPS["uvloop"] = uvloop.new_event_loop
+
+
+class _FactoryPolicy(asyncio.DefaultEventLoopPolicy):
+    """
+    An event loop policy whose new loops come from a factory, for Python
+    versions without asyncio.Runner.
+    """
+
+    def __init__(self,
+                 factory: Callable[[], asyncio.AbstractEventLoop]) -> None:
+        """
+        Create a policy whose loops come from factory.
+
+        Args:
+            factory (Callable): Returns a new event loop.
+        """
+        super().__init__()
+        self._factory = factory
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Create a new event loop.
+
+        Returns:
+            asyncio.AbstractEventLoop: A new loop from the factory.
+        """
+        return self._factory()
+
+
+def run(coro: Coroutine[Any, Any, T], loop: str = "asyncio") -> T:
+    """
+    Run coro to completion on a new event loop of the given kind, exactly
+    as asyncio.run does: on return, error or interrupt the tasks still
+    pending are cancelled, and async generators and the default executor
+    are shut down, before the loop is closed.
+
+    Args:
+        coro (Coroutine): The coroutine to run.
+        loop (str): A key of EVENT_LOOPS. Default is "asyncio".
+
+    Returns:
+        The result of coro.
+    """
+    if loop not in EVENT_LOOPS:
+        coro.close()
+        raise ValueError("unknown event loop {!r}, expected one of {}".format(
+            loop, ", ".join(EVENT_LOOPS)))
+    if getattr(asyncio, "Runner", None) is not None:
+        with asyncio.Runner(loop_factory=EVENT_LOOPS[loop]) as runner:
+            return runner.run(coro)
+    if EVENT_LOOPS[loop] is asyncio.new_event_loop:
+        return asyncio.run(coro)
+    policy = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(_FactoryPolicy(EVENT_LOOPS[loop]))
+    try:
+        return asyncio.run(coro)
+    finally:
+        asyncio.set_event_loop_policy(policy)
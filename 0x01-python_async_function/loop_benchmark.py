@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+This module contains a benchmarking harness for asyncio workloads.
+
+Each run executes the workload on a fresh event loop and is timed with
+time.perf_counter_ns, while a monitor task measures event-loop lag: how
+late a short sleep wakes up. Warmup runs are discarded. The summary
+(median, p95, mean, stddev, min, max) is written as JSON with sorted keys,
+so results of two runs can be diffed.
+
+Each project passes main() its workloads and the command-line options
+they read; see 7-benchmark.py and 0x02's 3-benchmark.py. Only
+event_loops is imported from this project, so 0x02 can load this module
+by file path.
+"""
+from typing import (Any, Awaitable, Callable, Dict, List, Optional,
+                    Sequence, Tuple)
+import argparse
+import asyncio
+import json
+import math
+import platform
+import statistics
+import time
+from event_loops import EVENT_LOOPS, run
+
+Workload = Callable[[], Awaitable[Any]]
+Workloads = Dict[str, Callable[[argparse.Namespace], Workload]]
+Option = Tuple[Tuple[str, ...], Dict[str, Any]]
+
+
+def summarize(samples: List[int]) -> Dict[str, float]:
+    """
+    Summarize nanosecond samples.
+
+    Args:
+        samples (List[int]): The samples, in nanoseconds.
+
+    Returns:
+        Dict[str, float]: count, min, median, p95, mean, stddev and max.
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    p95 = ordered[max(1, math.ceil(0.95 * len(ordered))) - 1]
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "p95": p95,
+        "mean": statistics.fmean(ordered),
+        "stddev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "max": ordered[-1],
+    }
+
+
+async def _monitor_lag(interval: float, lags: List[int]) -> None:
+    """
+    Record how late a sleep of interval seconds wakes up, until cancelled.
+
+    Args:
+        interval (float): The number of seconds to sleep between samples.
+        lags (List[int]): The list the lags, in nanoseconds, are added to.
+    """
+    expected = int(interval * 1e9)
+    while True:
+        start = time.perf_counter_ns()
+        await asyncio.sleep(interval)
+        lags.append(max(0, time.perf_counter_ns() - start - expected))
+
+
+async def _timed_run(workload: Workload,
+                     lag_interval: float) -> Tuple[int, List[int]]:
+    """
+    Run the workload once under the lag monitor.
+
+    Args:
+        workload (Workload): Returns the awaitable to time.
+        lag_interval (float): The lag monitor's sampling interval.
+
+    Returns:
+        Tuple[int, List[int]]: The run time and the lags, in nanoseconds.
+    """
+    lags: List[int] = []
+    monitor = asyncio.ensure_future(_monitor_lag(lag_interval, lags))
+    try:
+        start = time.perf_counter_ns()
+        await workload()
+        elapsed = time.perf_counter_ns() - start
+    finally:
+        monitor.cancel()
+        try:
+            await monitor
+        except asyncio.CancelledError:
+            pass
+    return elapsed, lags
+
+
+def benchmark(workload: Workload, warmup: int = 1, repeats: int = 5,
+              loop: str = "asyncio",
+              lag_interval: float = 0.001) -> Dict[str, Any]:
+    """
+    Time repeated runs of a workload on one kind of event loop.
+
+    Args:
+        workload (Workload): Returns a new awaitable for each run.
+        warmup (int): The number of untimed runs first. Default is 1.
+        repeats (int): The number of timed runs. Default is 5.
+        loop (str): A key of EVENT_LOOPS. Default is "asyncio".
+        lag_interval (float): The lag monitor's sampling interval in
+            seconds. Default is 0.001.
+
+    Returns:
+        Dict[str, Any]: The run time and loop lag summaries, in
+            nanoseconds, with the settings they were measured with.
+    """
+    times: List[int] = []
+    lags: List[int] = []
+    for i in range(warmup + repeats):
+        elapsed, run_lags = run(_timed_run(workload, lag_interval), loop)
+        if i >= warmup:
+            times.append(elapsed)
+            lags.extend(run_lags)
+    return {
+        "loop": loop,
+        "warmup": warmup,
+        "repeats": repeats,
+        "lag_interval": lag_interval,
+        "time_ns": summarize(times),
+        "loop_lag_ns": summarize(lags),
+    }
+
+
+def main(argv: Optional[List[str]], workloads: Workloads,
+         options: Sequence[Option] = ()) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (List[str]): The arguments, or None for sys.argv.
+        workloads (Workloads): The workloads to choose from, by name, each
+            building a Workload from the parsed arguments.
+        options (Sequence[Option]): The (flags, keyword arguments) of the
+            argparse options the workloads read; their values are part of
+            the report. Default is none.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark an asyncio workload.")
+    parser.add_argument("--workload", choices=list(workloads),
+                        default=next(iter(workloads)))
+    settings = [parser.add_argument(*flags, **kwargs).dest
+                for flags, kwargs in options]
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--loop", choices=[*EVENT_LOOPS, "all"],
+                        default="asyncio")
+    parser.add_argument("--lag-interval", type=float, default=0.001)
+    parser.add_argument("--output", help="JSON file (default stdout)")
+    args = parser.parse_args(argv)
+
+    workload = workloads[args.workload](args)
+    loops = list(EVENT_LOOPS) if args.loop == "all" else [args.loop]
+    report = {
+        "workload": args.workload,
+        **{setting: getattr(args, setting) for setting in settings},
+        "python": platform.python_version(),
+        "results": [
+            benchmark(workload, args.warmup, args.repeats, loop,
+                      args.lag_interval)
+            for loop in loops
+        ],
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0
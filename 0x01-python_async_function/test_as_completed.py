@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Unit tests for the streaming variants of wait_n and task_wait_n."""
+import asyncio
+import random
+import unittest
+from importlib import import_module
+from unittest.mock import patch
+from parameterized import parameterized
+from event_loops import run
+
+as_completed_5 = import_module('5-as_completed')
+STREAMS = [
+    ("coroutines", as_completed_5.wait_n_as_completed),
+    ("tasks", as_completed_5.task_wait_n_as_completed),
+]
+
+
+class TestAsCompleted(unittest.TestCase):
+    """Test case for wait_n_as_completed and task_wait_n_as_completed."""
+
+    @parameterized.expand(STREAMS)
+    def test_completion_order(self, _, stream):
+        """Test delays are yielded as they finish, shortest first."""
+        async def main():
+            """Collect the stream."""
+            return [delay async for delay in stream(3, 1)]
+
+        with patch.object(random, "uniform", side_effect=[0.03, 0.01, 0.02]):
+            self.assertEqual(run(main()), [0.01, 0.02, 0.03])
+
+    @parameterized.expand(STREAMS)
+    def test_aclose_cancels_pending(self, _, stream):
+        """Test closing the stream early cancels every pending sleeper."""
+        async def main():
+            """Take the first delay, close, and return the tasks left."""
+            delays = stream(3, 10)
+            first = await delays.__anext__()
+            await delays.aclose()
+            await asyncio.sleep(0)
+            return first, asyncio.all_tasks() - {asyncio.current_task()}
+
+        with patch.object(random, "uniform", side_effect=[10, 0, 10]):
+            first, pending = run(main())
+        self.assertEqual(first, 0)
+        self.assertEqual(pending, set())
+
+
+class TestWaitNMerged(unittest.TestCase):
+    """Test case for wait_n_merged."""
+
+    @parameterized.expand([(False,), (True,)])
+    def test_sorted(self, tasks):
+        """Test the result is exactly sorted() of the delays drawn."""
+        drawn = [random.uniform(0, 0.02) for _ in range(200)]
+        with patch.object(random, "uniform", side_effect=drawn):
+            delays = run(as_completed_5.wait_n_merged(200, 1, tasks))
+        self.assertEqual(delays, sorted(drawn))
+
+    def test_zero(self):
+        """Test no coroutines give no delays."""
+        self.assertEqual(run(as_completed_5.wait_n_merged(0, 1)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Unit tests for event_loops.run."""
+import asyncio
+import unittest
+import warnings
+from contextlib import nullcontext
+from unittest.mock import patch
+import event_loops
+from event_loops import EVENT_LOOPS, run
+
+
+async def running_loop() -> asyncio.AbstractEventLoop:
+    """Return the loop this coroutine runs on."""
+    return asyncio.get_running_loop()
+
+
+class TestRun(unittest.TestCase):
+    """Test case for run, with and without asyncio.Runner."""
+
+    def setUp(self):
+        """Run every test on both code paths of run."""
+        runner = getattr(asyncio, "Runner", None)
+        self.variants = [{}] if runner is None else [{}, {"Runner": None}]
+
+    def variant(self, attributes):
+        """Patch asyncio to look like a Python without Runner."""
+        return patch.multiple(asyncio, **attributes) \
+            if attributes else nullcontext()
+
+    def test_returns_result(self):
+        """Test the result of the coroutine is returned."""
+        for attributes in self.variants:
+            with self.variant(attributes):
+                self.assertEqual(run(asyncio.sleep(0, "done")), "done")
+
+    def test_unknown_loop(self):
+        """Test an unknown loop fails without leaking the coroutine."""
+        coro = asyncio.sleep(0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with self.assertRaises(ValueError):
+                run(coro, "nope")
+        self.assertIsNone(coro.cr_frame)
+
+    def test_cancels_pending_tasks(self):
+        """Test tasks still pending on error are cancelled, as asyncio.run
+        does.
+        """
+        for attributes in self.variants:
+            tasks = []
+
+            async def fail():
+                """Start a long task, then fail."""
+                tasks.append(asyncio.ensure_future(asyncio.sleep(10)))
+                await asyncio.sleep(0)
+                raise RuntimeError("boom")
+
+            with self.variant(attributes), self.assertRaises(RuntimeError):
+                run(fail())
+            self.assertTrue(tasks[0].cancelled())
+
+    def test_registered_loop(self):
+        """Test a loop of EVENT_LOOPS other than asyncio is used, as uvloop
+        is when installed.
+        """
+        policy = asyncio.get_event_loop_policy()
+        for attributes in self.variants:
+            created = []
+
+            def factory():
+                """Create and record a new loop."""
+                created.append(asyncio.SelectorEventLoop())
+                return created[-1]
+
+            with self.variant(attributes), \
+                    patch.dict(EVENT_LOOPS, {"uvloop": factory}):
+                loop = run(running_loop(), "uvloop")
+            self.assertEqual(created, [loop])
+            self.assertTrue(loop.is_closed())
+            self.assertIs(asyncio.get_event_loop_policy(), policy)
+
+    @unittest.skipIf(event_loops.uvloop is None, "uvloop is not installed")
+    def test_uvloop(self):
+        """Test the uvloop entry runs coroutines on a uvloop loop."""
+        loop = run(running_loop(), "uvloop")
+        self.assertIsInstance(loop, event_loops.uvloop.Loop)
+
+
+if __name__ == "__main__":
+    unittest.main()
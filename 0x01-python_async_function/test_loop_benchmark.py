@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for the loop_benchmark harness and 7-benchmark."""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from importlib import import_module
+from parameterized import parameterized
+from loop_benchmark import main, summarize
+
+benchmark_7 = import_module('7-benchmark')
+
+
+class TestSummarize(unittest.TestCase):
+    """Test case for summarize."""
+
+    def test_empty(self):
+        """Test no samples only report their count."""
+        self.assertEqual(summarize([]), {"count": 0})
+
+    def test_one_sample(self):
+        """Test a single sample is every statistic, without spread."""
+        self.assertEqual(summarize([7]), {
+            "count": 1, "min": 7, "median": 7, "p95": 7, "mean": 7,
+            "stddev": 0.0, "max": 7,
+        })
+
+    @parameterized.expand([
+        (list(range(1, 21)), 19),
+        (list(range(1, 101)), 95),
+        (list(range(1, 102)), 96),
+        ([5, 1], 5),
+    ])
+    def test_p95(self, samples, p95):
+        """Test p95 is the nearest-rank sample, in any input order."""
+        self.assertEqual(summarize(samples[::-1])["p95"], p95)
+
+
+class TestMain(unittest.TestCase):
+    """Test case for main."""
+
+    def setUp(self):
+        """Create a temporary directory for reports."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output = os.path.join(self.tmp.name, "report.json")
+
+    def report(self, *argv, **kwargs):
+        """Run main with argv and return the report it wrote."""
+        self.assertEqual(
+            main([*argv, "--output", self.output], **kwargs), 0)
+        with open(self.output) as report:
+            return json.load(report)
+
+    def test_tiny_workload(self):
+        """Test the report holds the declared options and every run."""
+        seen = []
+
+        async def tiny(delay):
+            """Record the delay, then sleep for it."""
+            seen.append(delay)
+            await asyncio.sleep(delay)
+
+        workloads = {"sleep": lambda args: lambda: tiny(args.delay)}
+        options = [(("--delay",), {"type": float, "default": 0.5})]
+        report = self.report("--delay", "0", "--warmup", "1",
+                             "--repeats", "2", workloads=workloads,
+                             options=options)
+
+        self.assertEqual(seen, [0.0] * 3)
+        self.assertEqual(report["workload"], "sleep")
+        self.assertEqual(report["delay"], 0.0)
+        result, = report["results"]
+        self.assertEqual(result["loop"], "asyncio")
+        self.assertEqual(result["time_ns"]["count"], 2)
+
+    def test_no_options(self):
+        """Test workloads without options report no settings of theirs."""
+        workloads = {"noop": lambda args: lambda: asyncio.sleep(0)}
+        report = self.report("--repeats", "1", workloads=workloads)
+        self.assertNotIn("n", report)
+        self.assertEqual(set(report), {"python", "results", "workload"})
+
+    def test_7_benchmark(self):
+        """Test 7-benchmark reports the wait_n settings it ran with."""
+        benchmark_7.main(["-n", "3", "--max-delay", "0", "--warmup", "0",
+                          "--repeats", "1", "--workload", "task_wait_n",
+                          "--output", self.output])
+        with open(self.output) as report:
+            report = json.load(report)
+        self.assertEqual((report["n"], report["max_delay"]), (3, 0.0))
+        self.assertEqual(report["workload"], "task_wait_n")
+
+
+if __name__ == "__main__":
+    unittest.main()
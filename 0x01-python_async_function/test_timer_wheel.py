@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Unit tests for the TimerWheel sleep service."""
+import asyncio
+import random
+import unittest
+from importlib import import_module
+from unittest.mock import patch
+from event_loops import run
+
+TimerWheel = import_module('6-timer_wheel').TimerWheel
+
+
+class TestTimerWheel(unittest.TestCase):
+    """Test case for TimerWheel."""
+
+    def test_bad_tick(self):
+        """Test a tick that is not positive is rejected."""
+        with self.assertRaises(ValueError):
+            TimerWheel(0)
+
+    def test_one_timer_per_tick(self):
+        """Test sleepers of the same tick share one loop timer."""
+        wheel = TimerWheel(tick=0.05)
+
+        async def main():
+            """Start many sleepers, then count timers and ticks."""
+            loop = asyncio.get_running_loop()
+            with patch.object(loop, "call_at", wraps=loop.call_at) as call:
+                tasks = [asyncio.ensure_future(wheel.sleep(0.001))
+                         for _ in range(100)]
+                await asyncio.sleep(0)
+                ticks = len(wheel._slots)
+                await asyncio.gather(*tasks)
+            return call.call_count, ticks
+
+        timers, ticks = run(main())
+        self.assertEqual(timers, ticks)
+        self.assertLessEqual(timers, 2)
+
+    def test_never_early(self):
+        """Test every sleeper wakes at or after its delay, within a tick."""
+        wheel = TimerWheel(tick=0.02)
+
+        async def nap(delay):
+            """Sleep on the wheel and return how long it took."""
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await wheel.sleep(delay)
+            return loop.time() - start
+
+        async def main():
+            """Sleep many random delays at once."""
+            delays = [random.uniform(0, 0.1) for _ in range(50)]
+            return delays, await asyncio.gather(*map(nap, delays))
+
+        delays, slept = run(main())
+        for delay, elapsed in zip(delays, slept):
+            self.assertGreaterEqual(elapsed, delay)
+            self.assertLess(elapsed, delay + 0.02 + 0.1)
+        self.assertEqual(wheel._slots, {})
+
+    def test_cancel(self):
+        """Test a cancelled sleeper leaves its tick, and an empty tick
+        cancels its timer.
+        """
+        wheel = TimerWheel(tick=10)
+
+        async def main():
+            """Cancel one of two sleepers, then the other."""
+            loop = asyncio.get_running_loop()
+            with patch.object(loop, "call_at", wraps=loop.call_at) as call:
+                first = asyncio.ensure_future(wheel.sleep(1))
+                second = asyncio.ensure_future(wheel.sleep(1))
+                await asyncio.sleep(0)
+            self.assertEqual(call.call_count, 1)
+            timer, = wheel._timers.values()
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+            self.assertEqual([len(waiters)
+                              for waiters in wheel._slots.values()], [1])
+            self.assertFalse(timer.cancelled())
+            second.cancel()
+            await asyncio.gather(second, return_exceptions=True)
+            self.assertEqual(wheel._slots, {})
+            self.assertTrue(timer.cancelled())
+
+        run(main())
+
+    def test_reuse_across_loops(self):
+        """Test a wheel moves to a new loop once its sleepers are gone."""
+        wheel = TimerWheel(tick=0.01)
+
+        async def abandon():
+            """Return while a long sleeper is pending, as run cancels it."""
+            asyncio.ensure_future(wheel.sleep(10))
+            await asyncio.sleep(0)
+
+        run(abandon())
+        self.assertEqual(wheel._slots, {})
+        run(wheel.sleep(0.01))
+        run(wheel.sleep(0.01))
+
+    def test_in_use_by_another_loop(self):
+        """Test a wheel with sleepers pending refuses a second loop."""
+        wheel = TimerWheel(tick=10)
+        loop = asyncio.new_event_loop()
+        try:
+            task = loop.create_task(wheel.sleep(1))
+            loop.run_until_complete(asyncio.sleep(0))
+            with self.assertRaises(RuntimeError):
+                run(wheel.sleep(0.01))
+            task.cancel()
+            loop.run_until_complete(asyncio.gather(
+                task, return_exceptions=True))
+        finally:
+            loop.close()
+        self.assertEqual(wheel._slots, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Unit tests for wait_n and task_wait_n."""
+import asyncio
+import unittest
+from importlib import import_module
+from parameterized import parameterized
+from event_loops import run
+
+wait_n = import_module('1-concurrent_coroutines').wait_n
+task_wait_n = import_module('4-tasks').task_wait_n
+SPAWNERS = [("wait_n", wait_n), ("task_wait_n", task_wait_n)]
+
+
+class TestWaitN(unittest.TestCase):
+    """Test case for wait_n and task_wait_n."""
+
+    def measure(self, spawn, n, concurrency):
+        """Run spawn, returning its delays and the peak sleepers and tasks
+        in flight.
+        """
+        peak = {"sleepers": 0, "tasks": 0}
+        sleepers = 0
+
+        async def sleep(delay):
+            """Sleep briefly, recording what is in flight."""
+            nonlocal sleepers
+            sleepers += 1
+            peak["sleepers"] = max(peak["sleepers"], sleepers)
+            peak["tasks"] = max(peak["tasks"], len(asyncio.all_tasks()))
+            try:
+                await asyncio.sleep(delay / 1000)
+            finally:
+                sleepers -= 1
+
+        delays = run(spawn(n, 5, concurrency=concurrency, sleep=sleep))
+        return delays, peak
+
+    @parameterized.expand(SPAWNERS)
+    def test_unbounded(self, _, spawn):
+        """Test every delay is returned, in ascending order."""
+        delays, peak = self.measure(spawn, 50, None)
+        self.assertEqual(len(delays), 50)
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(peak["sleepers"], 50)
+
+    @parameterized.expand(SPAWNERS)
+    def test_bounded(self, _, spawn):
+        """Test at most concurrency sleepers, and no more tasks than that
+        beside the caller, are in flight.
+        """
+        delays, peak = self.measure(spawn, 100, 10)
+        self.assertEqual(len(delays), 100)
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(peak["sleepers"], 10)
+        self.assertLessEqual(peak["tasks"], 1 + 10)
+
+    @parameterized.expand(SPAWNERS)
+    def test_zero(self, _, spawn):
+        """Test n=0 returns no delays, bounded or not."""
+        for concurrency in (None, 3):
+            self.assertEqual(self.measure(spawn, 0, concurrency)[0], [])
+
+    @parameterized.expand(SPAWNERS)
+    def test_bad_concurrency(self, _, spawn):
+        """Test concurrency below 1 is rejected."""
+        for concurrency in (0, -1):
+            with self.assertRaises(ValueError):
+                run(spawn(1, 1, concurrency=concurrency))
+
+    def test_cancel_bounded_tasks(self):
+        """Test cancelling bounded task_wait_n cancels its tasks."""
+        async def main():
+            """Cancel task_wait_n midway, then return the tasks left."""
+            outer = asyncio.ensure_future(task_wait_n(20, 10, 5))
+            await asyncio.sleep(0.01)
+            outer.cancel()
+            await asyncio.gather(outer, return_exceptions=True)
+            await asyncio.sleep(0)
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+        self.assertEqual(run(main()), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 """
 This module contains the measure_runtime coroutine.
+
+measure_runtime_per_loop drives it on the default asyncio event loop and
+on every other loop of EVENT_LOOPS, which includes uvloop when installed.
+Both come from 0x01-python_async_function/event_loops.py.
 """
 import asyncio
 import time
+from typing import Dict
 async_comprehension = __import__("1-async_comprehension").async_comprehension
+event_loops = __import__("async_function").load("event_loops")
+EVENT_LOOPS = event_loops.EVENT_LOOPS
+run = event_loops.run
 
 
 async def measure_runtime() -> float:
@@ -15,7 +23,17 @@ async def measure_runtime() -> float:
     Returns:
         float: The total runtime.
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
     await asyncio.gather(*(async_comprehension() for _ in range(4)))
-    end_time = time.time()
+    end_time = time.perf_counter()
     return end_time - start_time
+
+
+def measure_runtime_per_loop() -> Dict[str, float]:
+    """
+    Run measure_runtime on every available event loop.
+
+    Returns:
+        Dict[str, float]: The total runtime, by event loop.
+    """
+    return {loop: run(measure_runtime(), loop) for loop in EVENT_LOOPS}
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+This module benchmarks async_comprehension and measure_runtime.
+
+Usage: ./3-benchmark.py [--workload NAME] [--warmup N] [--repeats N]
+                        [--loop LOOP|all] [--lag-interval SECONDS]
+                        [--output FILE]
+
+The runs are timed and summarized by the harness of the 0x01 project,
+0x01-python_async_function/loop_benchmark.py, loaded by file path, so
+both projects report the same JSON format. Neither workload takes any
+option of its own.
+"""
+from typing import List, Optional
+import sys
+from importlib import import_module
+
+async_comprehension = import_module(
+    '1-async_comprehension').async_comprehension
+measure_runtime = import_module('2-measure_runtime').measure_runtime
+load = import_module('async_function').load
+load('event_loops')
+loop_benchmark = load('loop_benchmark')
+
+WORKLOADS = {
+    "async_comprehension": lambda args: async_comprehension,
+    "measure_runtime": lambda args: measure_runtime,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (List[str]): The arguments. Default is None, for sys.argv.
+
+    Returns:
+        int: The exit status.
+    """
+    return loop_benchmark.main(argv, WORKLOADS)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
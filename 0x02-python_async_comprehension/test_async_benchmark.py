@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Unit tests for 3-benchmark."""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from importlib import import_module
+from unittest.mock import patch
+import async_function
+
+benchmark_3 = import_module('3-benchmark')
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test case for 3-benchmark."""
+
+    def test_harness_from_0x01(self):
+        """Test the 0x01 harness and loops are loaded from their files."""
+        for name in ("event_loops", "loop_benchmark"):
+            self.assertEqual(
+                os.path.realpath(sys.modules[name].__file__),
+                os.path.realpath(os.path.join(async_function.DIRECTORY,
+                                              name + ".py")))
+        self.assertIs(benchmark_3.loop_benchmark,
+                      async_function.load("loop_benchmark"))
+
+    def test_report(self):
+        """Test the report carries no option the workloads do not read."""
+        workloads = {"tiny": lambda args: lambda: asyncio.sleep(0)}
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(benchmark_3.WORKLOADS, workloads, clear=True):
+            output = os.path.join(tmp, "report.json")
+            self.assertEqual(benchmark_3.main(
+                ["--warmup", "0", "--repeats", "1", "--output", output]), 0)
+            with open(output) as report:
+                report = json.load(report)
+        self.assertEqual(set(report), {"python", "results", "workload"})
+        self.assertEqual(report["results"][0]["time_ns"]["count"], 1)
+
+    def test_refuses_other_module(self):
+        """Test a different module of the same name is not reused."""
+        with patch.dict(sys.modules, {"loop_benchmark": unittest}):
+            with self.assertRaises(ImportError):
+                async_function.load("loop_benchmark")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""An asyncio github org client
+"""
+import asyncio
+import requests
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+)
+
+from client import GithubOrgClient
+from coalesce import Coalescer
+from http_cache import SQLiteCache
+from ratelimit import PRIORITY_PAGES, RateLimitScheduler
+from resilience import CircuitBreaker, RetryPolicy
+from utils import (
+    DEFAULT_TIMEOUT,
+    Timeout,
+    get_json_page,
+    remaining_page_urls,
+    with_query,
+)
+
+
+class AsyncGithubOrgClient:
+    """An asyncio Github org client.
+    Blocking HTTP calls run on an executor so that many orgs, and the
+    pages of each org, can be awaited concurrently on one event loop.
+    Example
+    -------
+    >>> scan = AsyncGithubOrgClient.fetch_many(["google", "abc"])
+    >>> asyncio.run(scan)  # doctest: +SKIP
+    {'google': [...], 'abc': [...]}
+    """
+    ORG_URL = GithubOrgClient.ORG_URL
+    PER_PAGE = GithubOrgClient.PER_PAGE
+
+    has_license = staticmethod(GithubOrgClient.has_license)
+
+    def __init__(
+        self,
+        org_name: str,
+        session: requests.Session = None,
+        cache: SQLiteCache = None,
+        executor: Executor = None,
+        scheduler: RateLimitScheduler = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        retry: RetryPolicy = None,
+        breaker: CircuitBreaker = None,
+        coalescer: Coalescer = None,
+    ) -> None:
+        """Init method of AsyncGithubOrgClient.
+        Without ``executor`` the event loop's default executor is used.
+        The other options are those of ``GithubOrgClient``; a
+        ``coalescer`` is shared between tasks without tying up threads.
+        """
+        self._org_name = org_name
+        self._executor = executor
+        self._coalescer = coalescer
+        self._options = {
+            "session": session,
+            "cache": cache,
+            "scheduler": scheduler,
+            "timeout": timeout,
+            "retry": retry,
+            "breaker": breaker,
+        }
+        self._memo: Dict[str, asyncio.Future] = {}
+
+    async def _run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run blocking ``fn`` on the executor with this client's options."""
+        loop = asyncio.get_running_loop()
+        call = partial(fn, *args, **self._options, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def _get_page(self, url: str, **kwargs: Any) -> Tuple[Any, Dict]:
+        """``get_json_page`` on the executor, coalesced when configured."""
+        fetch = partial(self._run, get_json_page, url, **kwargs)
+        if self._coalescer is None:
+            return await fetch()
+        return await self._coalescer.aget(url, fetch)
+
+    def _memoize(self, name: str, factory: Callable[[], Awaitable]) -> Any:
+        """Share one in-flight or finished ``factory()`` per ``name``.
+        A failed fetch is forgotten so that the next caller retries it.
+        """
+        future = self._memo.get(name)
+        if future is None or future.done() and (
+                future.cancelled() or future.exception() is not None):
+            future = asyncio.ensure_future(factory())
+            self._memo[name] = future
+        return asyncio.shield(future)
+
+    async def org(self) -> Dict:
+        """Memoize org"""
+        url = self.ORG_URL.format(org=self._org_name)
+        page = await self._memoize("org", partial(self._get_page, url))
+        return page[0]
+
+    async def _public_repos_url(self) -> str:
+        """Public repos URL"""
+        return (await self.org())["repos_url"]
+
+    async def _fetch_repos(self) -> List[Dict]:
+        """Fetch the first page, then the remaining pages concurrently."""
+        url = with_query(await self._public_repos_url(),
+                         per_page=self.PER_PAGE)
+        payload, links = await self._get_page(url, priority=PRIORITY_PAGES)
+        payload = list(payload)
+
+        if "last" in links:
+            pages = await asyncio.gather(*(
+                self._get_page(page_url, priority=PRIORITY_PAGES)
+                for page_url in remaining_page_urls(links)
+            ))
+            for page, _ in pages:
+                payload.extend(page)
+            return payload
+
+        while "next" in links:
+            page, links = await self._get_page(
+                links["next"]["url"], priority=PRIORITY_PAGES)
+            payload.extend(page)
+        return payload
+
+    async def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload"""
+        return await self._memoize("repos_payload", self._fetch_repos)
+
+    async def public_repos(self, license: str = None) -> List[str]:
+        """Public repos"""
+        return [
+            repo["name"] for repo in await self.repos_payload()
+            if license is None or self.has_license(repo, license)
+        ]
+
+    @classmethod
+    async def fetch_many(
+        cls,
+        org_names: Iterable[str],
+        license: str = None,
+        concurrency: int = 10,
+        return_exceptions: bool = False,
+        **client_options: Any,
+    ) -> Dict[str, List[str]]:
+        """Public repos of many orgs, with at most ``concurrency`` orgs
+        being fetched at a time.
+        With ``return_exceptions`` a failing org maps to its exception
+        instead of aborting the whole scan.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        own_executor = "executor" not in client_options
+        if own_executor:
+            client_options["executor"] = ThreadPoolExecutor(
+                max_workers=concurrency)
+
+        async def scan(org_name: str) -> List[str]:
+            """Public repos of one org under the semaphore."""
+            async with semaphore:
+                client = cls(org_name, **client_options)
+                return await client.public_repos(license)
+
+        org_names = list(dict.fromkeys(org_names))
+        try:
+            results = await asyncio.gather(
+                *(scan(org_name) for org_name in org_names),
+                return_exceptions=return_exceptions,
+            )
+        finally:
+            if own_executor:
+                client_options["executor"].shutdown(wait=False)
+        return dict(zip(org_names, results))
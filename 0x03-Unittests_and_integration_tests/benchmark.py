@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Benchmark the github org clients against a local fake GitHub API.
+
+Usage: ./benchmark.py [--repos N ...] [--modes MODE ...] [--repeats N]
+                      [--latency SECONDS] [--rate-limit N] [--json]
+
+Each ``--repos`` size becomes a synthetic org, ``synthetic-<size>``,
+served with ``Link`` pagination and rate-limit headers by a threaded
+server on localhost. For every mode (``sync``: one page at a time,
+``threaded``: pages fetched concurrently, ``async``: the asyncio client)
+the ``org``, ``repos_payload`` and ``public_repos`` calls of a fresh
+client are timed ``--repeats`` times, then run once more under
+``tracemalloc`` for their peak memory. ``has_license`` is timed over
+every repo of each org. Results are printed as a table, or as JSON.
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+from urllib.parse import parse_qsl, urlsplit
+
+from async_client import AsyncGithubOrgClient
+from client import GithubOrgClient
+from ratelimit import RateLimitScheduler
+from resilience import CircuitBreaker
+from utils import make_session
+
+MODES = ("sync", "threaded", "async")
+LICENSES = ("mit", "apache-2.0", "bsd-3-clause", None)
+_ORG_PATH = re.compile(
+    r"^/orgs/(?P<org>[\w.-]+?-(?P<size>\d+))(?P<repos>/repos)?$")
+
+
+def synthetic_repo(org: str, i: int) -> Dict:
+    """The ``i``-th repo of ``org``, shaped like a GitHub listing item."""
+    key = LICENSES[i % len(LICENSES)]
+    day = "2024-{:02d}-{:02d}T00:00:00Z".format(i % 12 + 1, i % 28 + 1)
+    return {
+        "id": i,
+        "name": "{}-repo-{}".format(org, i),
+        "full_name": "{}/{}-repo-{}".format(org, org, i),
+        "private": False,
+        "owner": {"login": org, "type": "Organization"},
+        "license": None if key is None else {"key": key, "name": key},
+        "stargazers_count": i * 7919 % 5000,
+        "forks": i * 104729 % 300,
+        "updated_at": day,
+        "pushed_at": day,
+    }
+
+
+@lru_cache(maxsize=1024)
+def _repos_page(org: str, size: int, per_page: int, page: int) -> bytes:
+    """Encoded page ``page`` of the listing of ``org``."""
+    start = (page - 1) * per_page
+    return json.dumps([
+        synthetic_repo(org, i)
+        for i in range(start, min(size, start + per_page))
+    ]).encode()
+
+
+class FakeGithubHandler(BaseHTTPRequestHandler):
+    """Serve ``/orgs/<name>-<size>`` and its paginated ``/repos``."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        """Answer one org or one page of its repos."""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        parts = urlsplit(self.path)
+        match = _ORG_PATH.match(parts.path)
+        if match is None:
+            return self._send(404, b'{"message": "Not Found"}')
+        if not server.spend():
+            return self._send(403, b'{"message": "API rate limit exceeded"}')
+
+        org, size = match["org"], int(match["size"])
+        base = "http://{}:{}/orgs/{}".format(*server.server_address, org)
+        if match["repos"] is None:
+            body = json.dumps({
+                "login": org,
+                "public_repos": size,
+                "repos_url": base + "/repos",
+            }).encode()
+            return self._send(200, body)
+
+        query = dict(parse_qsl(parts.query))
+        per_page = min(100, int(query.get("per_page", 30)))
+        page = int(query.get("page", 1))
+        last = max(1, -(-size // per_page))
+        links = []
+        if page < last:
+            links.append('<{}/repos?per_page={}&page={}>; rel="next"'.format(
+                base, per_page, page + 1))
+            links.append('<{}/repos?per_page={}&page={}>; rel="last"'.format(
+                base, per_page, last))
+        body = _repos_page(org, size, per_page, page) if page <= last \
+            else b"[]"
+        self._send(200, body, {"Link": ", ".join(links)} if links else {})
+
+    def _send(self, status: int, body: bytes,
+              headers: Dict[str, str] = None) -> None:
+        """Write a JSON response with the current rate-limit headers."""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in self.server.rate_headers().items():
+            self.send_header(name, value)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """Keep the benchmark output clean."""
+
+
+class FakeGithub(ThreadingHTTPServer):
+    """A local GitHub API serving synthetic orgs.
+    Every answer is delayed by ``latency`` seconds and carries
+    ``X-RateLimit-*`` headers for a budget of ``rate_limit`` calls per
+    ``rate_window`` seconds; calls over budget get a 403.
+    """
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        rate_limit: int = 1000000,
+        rate_window: float = 3600.0,
+    ) -> None:
+        """Init method of FakeGithub"""
+        super().__init__(address, FakeGithubHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._remaining = rate_limit
+        self._reset = time.time() + rate_window
+
+    def spend(self) -> bool:
+        """Count one call against the budget; False when over it."""
+        with self._lock:
+            self.requests += 1
+            if time.time() >= self._reset:
+                self._remaining = self.rate_limit
+                self._reset = time.time() + self.rate_window
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+    def rate_headers(self) -> Dict[str, str]:
+        """``X-RateLimit-*`` headers of the current window."""
+        with self._lock:
+            return {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self._remaining),
+                "X-RateLimit-Reset": str(int(math.ceil(self._reset))),
+            }
+
+    @property
+    def base_url(self) -> str:
+        """Root URL of the server."""
+        return "http://{}:{}".format(*self.server_address)
+
+
+@contextmanager
+def serve(**settings: Any) -> Iterator[FakeGithub]:
+    """Run a ``FakeGithub`` on a background thread while in the block."""
+    server = FakeGithub(**settings)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank ``q``-th percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(call: Callable[[], Any], repeats: int,
+            items: int = 1) -> Dict[str, float]:
+    """Latency, throughput and peak memory of ``call``.
+    ``items`` is how many items (calls, repos) one call handles, for the
+    throughput figure. Memory is traced in an extra run so the tracing
+    overhead does not skew the timings.
+    """
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": repeats,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "items_per_s": items * repeats / sum(latencies),
+        "peak_kib": peak / 1024,
+    }
+
+
+def _client_calls(mode: str, org: str, base_url: str,
+                  options: Dict) -> Dict[str, Callable[[], Any]]:
+    """One benchmarked call per client method, each with a fresh client."""
+    org_url = base_url + "/orgs/{org}"
+
+    if mode == "async":
+        def run(method: str, *args: Any) -> Callable[[], Any]:
+            """Await ``method`` of a fresh async client."""
+            def call() -> Any:
+                client = AsyncGithubOrgClient(org, **options)
+                client.ORG_URL = org_url
+                return asyncio.run(getattr(client, method)(*args))
+            return call
+        return {
+            "org": run("org"),
+            "repos_payload": run("repos_payload"),
+            "public_repos": run("public_repos", "mit"),
+        }
+
+    workers = 1 if mode == "sync" else GithubOrgClient.MAX_WORKERS
+
+    def client() -> GithubOrgClient:
+        """A fresh client of this mode."""
+        fresh = GithubOrgClient(org, max_workers=workers, **options)
+        fresh.ORG_URL = org_url
+        return fresh
+    return {
+        "org": lambda: client().org,
+        "repos_payload": lambda: client().repos_payload,
+        "public_repos": lambda: client().public_repos("mit"),
+    }
+
+
+def run_benchmarks(
+    sizes: Sequence[int],
+    modes: Sequence[str] = MODES,
+    repeats: int = 5,
+    **server_settings: Any,
+) -> List[Dict[str, Any]]:
+    """Benchmark every mode against one synthetic org per size.
+    Returns one row per (org size, mode, operation).
+    """
+    rows: List[Dict[str, Any]] = []
+    with serve(**server_settings) as server:
+        for size in sizes:
+            org = "synthetic-{}".format(size)
+            for mode in modes:
+                session = make_session(
+                    pool_maxsize=GithubOrgClient.MAX_WORKERS)
+                options = {
+                    "session": session,
+                    "scheduler": RateLimitScheduler(),
+                    "breaker": CircuitBreaker(),
+                }
+                executor: Optional[ThreadPoolExecutor] = None
+                if mode == "async":
+                    executor = ThreadPoolExecutor(GithubOrgClient.MAX_WORKERS)
+                    options["executor"] = executor
+                try:
+                    calls = _client_calls(mode, org, server.base_url, options)
+                    for operation, call in calls.items():
+                        items = 1 if operation == "org" else size
+                        rows.append(dict(
+                            size=size, mode=mode, operation=operation,
+                            **measure(call, repeats, items)))
+                finally:
+                    session.close()
+                    if executor is not None:
+                        executor.shutdown()
+
+            repos = [synthetic_repo(org, i) for i in range(size)]
+            rows.append(dict(
+                size=size, mode="-", operation="has_license",
+                **measure(lambda: [
+                    GithubOrgClient.has_license(repo, "mit")
+                    for repo in repos
+                ], repeats, size)))
+    return rows
+
+
+def format_rows(rows: Sequence[Dict[str, Any]]) -> str:
+    """Benchmark rows as an aligned text table."""
+    header = "{:>7} {:<9} {:<14} {:>10} {:>10} {:>12} {:>10}".format(
+        "repos", "mode", "operation", "p50 ms", "p99 ms", "items/s",
+        "peak KiB")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            "{size:>7} {mode:<9} {operation:<14} {p50_ms:>10.2f} "
+            "{p99_ms:>10.2f} {items_per_s:>12.0f} {peak_kib:>10.0f}".format(
+                **row))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the github org clients on a fake GitHub.")
+    parser.add_argument("--repos", type=int, nargs="+",
+                        default=[10, 1000, 10000],
+                        help="repos of each synthetic org")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES,
+                        help="client modes to run")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="timed calls per operation")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every answer")
+    parser.add_argument("--rate-limit", type=int, default=1000000,
+                        help="calls allowed per rate-limit window")
+    parser.add_argument("--rate-window", type=float, default=3600.0,
+                        help="seconds of a rate-limit window")
+    parser.add_argument("--json", action="store_true",
+                        help="print the rows as JSON")
+    args = parser.parse_args(argv)
+
+    rows = run_benchmarks(
+        args.repos, args.modes, args.repeats,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+    )
+    print(json.dumps(rows, indent=2) if args.json else format_rows(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
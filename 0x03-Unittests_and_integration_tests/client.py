@@ -1,58 +1,300 @@
 #!/usr/bin/env python3
 """A github org client
 """
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
 from typing import (
+    Any,
+    Iterable,
+    Iterator,
     List,
     Dict,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
 )
 
+from coalesce import Coalescer
+from decoders import Decoder, schema_decoder
+from http_cache import SQLiteCache
+from instrument import timed
+from ratelimit import RateLimitScheduler
+from resilience import CircuitBreaker, RetryPolicy
+from snapshot import SnapshotStore
 from utils import (
+    DEFAULT_TIMEOUT,
+    ColumnarRecords,
+    Timeout,
     get_json,
-    access_nested_map,
-    memoize,
+    get_json_pages,
+    iter_json_pages,
+    compile_path,
+    make_session,
+    ttl_memoize,
+    with_query,
 )
 
+_license_key = compile_path(("license", "key"))
+
+
+def _key_url(key: Union[str, Tuple]) -> str:
+    """URL of a coalescer key, without its query string."""
+    url = key if isinstance(key, str) else key[0]
+    return url.split("?", 1)[0]
+
 
 class GithubOrgClient:
     """A Githib org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    LICENSE_FIELDS = (("name",), ("license", "key"))
+    PER_PAGE = 100
+    MAX_WORKERS = 8
 
-    def __init__(self, org_name: str) -> None:
-        """Init method of GithubOrgClient"""
+    def __init__(
+        self,
+        org_name: str,
+        max_workers: int = MAX_WORKERS,
+        session: requests.Session = None,
+        cache: SQLiteCache = None,
+        ttl: float = None,
+        fields: Sequence[Sequence] = None,
+        scheduler: RateLimitScheduler = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        retry: RetryPolicy = None,
+        breaker: CircuitBreaker = None,
+        coalescer: Coalescer = None,
+        snapshot: SnapshotStore = None,
+        decoder: Decoder = None,
+    ) -> None:
+        """Init method of GithubOrgClient.
+        Without ``session`` the pooled process-wide session is used.
+        A ``cache`` turns repeat fetches into conditional requests.
+        With a ``ttl`` (seconds) memoized payloads are refetched once stale.
+        With ``fields`` (key paths, as for ``access_nested_map``) the repos
+        payload keeps only those fields, plus the ones ``public_repos``
+        needs, in a compact ``ColumnarRecords``; unless a ``snapshot`` is
+        used, pages are decoded by a ``decoders.schema_decoder`` of them.
+        Other bodies are decoded by ``decoder``, by default the fastest
+        JSON backend installed.
+        Requests are paced by ``scheduler``, by default the one shared by
+        every client in the process. ``timeout`` (seconds, or a
+        (connect, read) tuple), ``retry`` and ``breaker`` are passed on to
+        ``get_json``; see ``resilience`` for the defaults.
+        Pass ``coalesce.get_coalescer()`` as ``coalescer`` to share fetches
+        of the same URLs with every other client in the process; shared
+        results older than ``ttl`` are not reused, and ``invalidate`` drops
+        the ones of this org.
+        With a ``snapshot`` store the repos are kept there between runs and
+        each fetch of ``repos_payload`` only asks for the repos updated
+        since the last one.
+        """
         self._org_name = org_name
+        self._max_workers = max_workers
+        self._cache = cache
+        self._coalescer = coalescer
+        self._coalesced_urls: Set[str] = set()
+        self._ttl = ttl
+        self._store = snapshot
+        self._decoder = decoder
+        self._options = {
+            "session": session,
+            "scheduler": scheduler,
+            "timeout": timeout,
+            "retry": retry,
+            "breaker": breaker,
+        }
+        self._fields = None if fields is None else list(dict.fromkeys(
+            tuple(path) for path in (*self.LICENSE_FIELDS, *fields)))
+        self._repos_decoder = decoder
+        if self._fields is not None and snapshot is None:
+            self._repos_decoder = schema_decoder(self._fields)
 
-    @memoize
+    @ttl_memoize(ttl=lambda self: self._ttl)
     def org(self) -> Dict:
         """Memoize org"""
-        return get_json(self.ORG_URL.format(org=self._org_name))
+        url = self.ORG_URL.format(org=self._org_name)
+        if self._coalescer is not None:
+            self._coalesced_urls.add(url)
+        return get_json(
+            url,
+            cache=self._cache,
+            coalescer=self._coalescer,
+            decoder=self._decoder,
+            max_age=self._ttl,
+            **self._options,
+        )
 
     @property
     def _public_repos_url(self) -> str:
         """Public repos URL"""
         return self.org["repos_url"]
 
-    @memoize
-    def repos_payload(self) -> Dict:
-        """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+    @ttl_memoize(ttl=lambda self: self._ttl)
+    def repos_payload(self) -> Sequence[Dict]:
+        """Memoize repos payload, following every page of the listing"""
+        if self._store is not None:
+            json_payload = self._refresh_snapshot()
+        else:
+            json_payload = self._fetch_repos()
+        if self._fields is None:
+            return json_payload
+        return ColumnarRecords(json_payload, self._fields)
 
-    def public_repos(self, license: str = None) -> List[str]:
-        """Public repos"""
-        json_payload = self.repos_payload
-        public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
-        ]
+    def _fetch_repos(self) -> List[Dict]:
+        """Every repo of the listing, pages fetched concurrently"""
+        url = self._public_repos_url
+        if self._coalescer is not None:
+            self._coalesced_urls.add(url)
+        return get_json_pages(
+            url,
+            per_page=self.PER_PAGE,
+            max_workers=self._max_workers,
+            cache=self._cache,
+            coalescer=self._coalescer,
+            decoder=self._repos_decoder,
+            max_age=self._ttl,
+            **self._options,
+        )
+
+    def _refresh_snapshot(self) -> List[Dict]:
+        """Bring the snapshot of this org up to date and return its repos.
+        The first refresh stores the whole listing. Later ones read it
+        most recently updated first and stop at the first repo older than
+        the snapshot's watermark, so unchanged pages are never fetched.
+        Deleted or renamed repos are only dropped by a full refresh, done
+        after ``snapshot.clear(org)``.
+        """
+        since = self._store.watermark(self._org_name)
+        if since is None:
+            self._store.replace(self._org_name, self._fetch_repos())
+            return self._store.repos(self._org_name)
+
+        changed = []
+        url = with_query(self._public_repos_url,
+                         sort="updated", direction="desc")
+        with closing(iter_json_pages(
+                url, per_page=self.PER_PAGE, **self._options)) as repos:
+            for repo in repos:
+                if (repo.get("updated_at") or "") < since:
+                    break
+                changed.append(repo)
+        # Oldest first, so repos created since keep their listing order.
+        self._store.upsert(self._org_name, reversed(changed))
+        return self._store.repos(self._org_name)
+
+    def invalidate(self) -> None:
+        """Forget the memoized org and repos payloads, and the coalesced
+        results of their URLs"""
+        type(self).org.invalidate(self)
+        type(self).repos_payload.invalidate(self)
+        if self._coalesced_urls:
+            urls = set(self._coalesced_urls)
+            self._coalescer.invalidate_where(
+                lambda key: _key_url(key) in urls)
+
+    def _license_index(self,
+                       json_payload: Sequence[Dict]) -> Dict[str, List]:
+        """Repo names by license key, built once per repos payload.
+        The index is rebuilt whenever the memoized payload is replaced.
+        """
+        built_for, index = getattr(self, "_license_index_of", (None, None))
+        if built_for is not json_payload:
+            index = {}
+            for repo in json_payload:
+                try:
+                    key = _license_key(repo)
+                except KeyError:
+                    continue
+                index.setdefault(key, []).append(repo["name"])
+            self._license_index_of = (json_payload, index)
+        return index
 
-        return public_repos
+    def iter_repos(self, fields: Sequence[Sequence] = None) -> Iterator[Dict]:
+        """Stream repos page by page without memoizing the payload.
+        With ``fields`` only those key paths of each repo are kept.
+        """
+        return iter_json_pages(
+            self._public_repos_url,
+            per_page=self.PER_PAGE,
+            fields=fields,
+            **self._options,
+        )
+
+    def public_repos(self, license: str = None,
+                     stream: bool = False) -> List[str]:
+        """Public repos.
+        The time spent filtering is reported to ``instrument`` hooks.
+        With ``stream`` the listing is parsed incrementally and only the
+        fields needed here are kept, instead of memoizing the payload.
+        """
+        if stream:
+            return [
+                repo["name"] for repo in self.iter_repos(self.LICENSE_FIELDS)
+                if license is None or self.has_license(repo, license)
+            ]
+
+        json_payload = self.repos_payload
+        with timed("filter", org=self._org_name):
+            if license is not None:
+                return list(
+                    self._license_index(json_payload).get(license, ()))
+            return [repo["name"] for repo in json_payload]
 
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
         try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
+            has_license = _license_key(repo) == license_key
         except KeyError:
             return False
         return has_license
+
+    @classmethod
+    def public_repos_many(
+        cls,
+        org_names: Iterable[str],
+        license: str = None,
+        max_workers: int = 8,
+        return_exceptions: bool = False,
+        page_workers: int = MAX_WORKERS,
+        **client_options: Any,
+    ) -> Iterator[Tuple[str, Union[List[str], BaseException]]]:
+        """Yield ``(org_name, public_repos)`` of many orgs as each finishes.
+        Orgs are fetched on a pool of ``max_workers`` threads sharing one
+        pooled session; each org fetches its pages on ``page_workers``
+        threads (the ``max_workers`` of each client), and the session's
+        pool is sized for both.
+        With ``return_exceptions`` a failing org is yielded with its
+        exception instead of raising it. Leaving the loop early cancels
+        the orgs not started yet.
+        """
+        own_session = client_options.get("session") is None
+        if own_session:
+            client_options["session"] = make_session(
+                pool_maxsize=max_workers * page_workers)
+
+        def scan(org_name: str) -> List[str]:
+            """Public repos of one org."""
+            return cls(org_name, max_workers=page_workers,
+                       **client_options).public_repos(license)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                executor.submit(scan, org_name): org_name
+                for org_name in dict.fromkeys(org_names)
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is not None and not return_exceptions:
+                    raise error
+                yield futures[future], \
+                    future.result() if error is None else error
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if own_session:
+                client_options["session"].close()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Process-wide coalescing of identical fetches.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+)
+
+__all__ = [
+    "Coalescer",
+    "get_coalescer",
+]
+
+
+class Coalescer:
+    """Share one fetch between every caller asking for the same key.
+    While a fetch is in flight, other callers wait for its result instead
+    of starting their own, whether they are threads (``get``) or asyncio
+    tasks (``aget``). Finished results are kept for ``ttl`` seconds in an
+    LRU of at most ``maxsize`` keys; a caller passing ``max_age`` only
+    reuses results fetched at most that many seconds ago. Results are
+    shared, so callers must treat them as read-only.
+    Example
+    -------
+    >>> coalescer = Coalescer()
+    >>> coalescer.get("k", lambda: 42)
+    42
+    >>> coalescer.get("k", lambda: 43)
+    42
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init method of Coalescer.
+        A ``ttl`` of None keeps results until evicted; 0 only shares
+        in-flight fetches.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._results: OrderedDict = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def _claim(self, key: Hashable,
+               max_age: Optional[float] = None) -> Tuple[Future, bool]:
+        """Future for ``key`` and whether the caller must fetch it."""
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                value, fetched, expires = entry
+                now = self._clock()
+                fresh = expires is None or expires > now
+                if fresh and (max_age is None or now - fetched < max_age):
+                    self._results.move_to_end(key)
+                    future: Future = Future()
+                    future.set_result(value)
+                    return future, False
+                # Expired, or too old for this caller, who refetches it.
+                del self._results[key]
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _settle(self, key: Hashable, future: Future,
+                value: Any = None, error: BaseException = None) -> None:
+        """Publish the leader's outcome to every waiter."""
+        with self._lock:
+            del self._inflight[key]
+            if error is None and self.ttl != 0:
+                now = self._clock()
+                expires = None if self.ttl is None else now + self.ttl
+                self._results[key] = (value, now, expires)
+                self._results.move_to_end(key)
+                while len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def get(self, key: Hashable, fetch: Callable[[], Any],
+            max_age: Optional[float] = None) -> Any:
+        """Result for ``key``, calling ``fetch()`` only if nobody else is.
+        Finished results older than ``max_age`` seconds are fetched again.
+        """
+        future, leader = self._claim(key, max_age)
+        if not leader:
+            return future.result()
+        try:
+            value = fetch()
+        except BaseException as error:
+            self._settle(key, future, error=error)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    async def aget(self, key: Hashable, fetch: Callable[[], Awaitable],
+                   max_age: Optional[float] = None) -> Any:
+        """Awaitable ``get`` where ``fetch()`` returns an awaitable."""
+        future, leader = self._claim(key, max_age)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await fetch()
+        except BaseException as error:
+            self._settle(key, future, error=error)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop the finished result of ``key``, or of every key."""
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop the finished result of every key ``predicate`` accepts."""
+        with self._lock:
+            for key in [key for key in self._results if predicate(key)]:
+                del self._results[key]
+
+
+_coalescer: Optional[Coalescer] = None
+_coalescer_lock = threading.Lock()
+
+
+def get_coalescer() -> Coalescer:
+    """Return the process-wide coalescer, creating it on first use.
+    """
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = Coalescer()
+    return _coalescer
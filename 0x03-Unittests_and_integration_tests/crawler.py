@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Crawl the public repos of many orgs across a process pool.
+
+Usage: ./crawler.py ORGS_FILE [--license KEY] [--processes N]
+                    [--output FILE] [--checkpoint FILE]
+
+Each line of ORGS_FILE names one org. Results are written as JSON Lines,
+one ``{"org": ..., "repos": [...]}`` (or ``{"org": ..., "error": ...}``)
+object per org, in completion order. With a checkpoint file, finished
+orgs are recorded there and skipped when the crawl is started again.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+from functools import partial
+from typing import (
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Type,
+)
+
+from client import GithubOrgClient
+
+
+def read_orgs(path: str) -> List[str]:
+    """Org names listed in ``path``, skipping blanks and ``#`` comments."""
+    with open(path) as orgs_file:
+        names = (line.strip() for line in orgs_file)
+        return list(dict.fromkeys(
+            name for name in names if name and not name.startswith("#")))
+
+
+def read_checkpoint(path: str) -> Set[str]:
+    """Org names already recorded as done in ``path``."""
+    try:
+        with open(path) as checkpoint:
+            return {line.strip() for line in checkpoint if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def crawl_org(
+    org_name: str,
+    license: str = None,
+    client: Type[GithubOrgClient] = None,
+) -> Dict:
+    """Public repos of one org, or the error that prevented fetching them.
+    ``client`` defaults to ``GithubOrgClient``.
+    """
+    if client is None:
+        client = GithubOrgClient
+    try:
+        repos = client(org_name).public_repos(license)
+    except Exception as error:
+        return {"org": org_name, "error": "{}: {}".format(
+            type(error).__name__, error)}
+    return {"org": org_name, "repos": repos}
+
+
+def crawl(
+    org_names: Iterable[str],
+    license: str = None,
+    processes: int = None,
+    chunksize: int = 4,
+    client: Type[GithubOrgClient] = None,
+) -> Iterator[Dict]:
+    """Yield ``crawl_org`` results in completion order.
+    Orgs are sharded ``chunksize`` at a time over ``processes`` workers,
+    which defaults to one per CPU; a single process crawls inline.
+    A ``client`` class is pickled to the workers by name, so it must be
+    importable there.
+    """
+    work = partial(crawl_org, license=license, client=client)
+    if processes == 1:
+        yield from map(work, org_names)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(work, org_names, chunksize)
+
+
+def write_results(
+    results: Iterable[Dict],
+    output: IO[str],
+    checkpoint: IO[str] = None,
+) -> int:
+    """Write ``results`` as JSON Lines and mark each org done.
+    An org is checkpointed only after its line is flushed, so a crash
+    can at worst repeat an org, never lose one. Returns the count.
+    """
+    count = 0
+    for result in results:
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        if checkpoint is not None and "error" not in result:
+            checkpoint.write(result["org"] + "\n")
+            checkpoint.flush()
+        count += 1
+    return count
+
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Crawl the public repos of many GitHub orgs.")
+    parser.add_argument("orgs_file", help="file with one org name per line")
+    parser.add_argument("--license", help="only keep repos with this key")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=4,
+                        help="orgs handed to a worker at a time")
+    parser.add_argument("--output", help="JSON Lines file (default stdout)")
+    parser.add_argument("--checkpoint",
+                        help="file recording finished orgs, for resuming")
+    args = parser.parse_args(argv)
+
+    done = read_checkpoint(args.checkpoint) if args.checkpoint else set()
+    org_names = [name for name in read_orgs(args.orgs_file)
+                 if name not in done]
+    results = crawl(org_names, args.license, args.processes, args.chunksize)
+
+    output = open(args.output, "a") if args.output else sys.stdout
+    checkpoint = open(args.checkpoint, "a") if args.checkpoint else None
+    try:
+        write_results(results, output, checkpoint)
+    finally:
+        if args.output:
+            output.close()
+        if checkpoint is not None:
+            checkpoint.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
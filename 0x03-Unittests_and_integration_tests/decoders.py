@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""JSON decoders working on raw response bytes.
+"""
+import json
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from paths import project
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+try:
+    import msgspec
+except ImportError:  # msgspec is optional
+    msgspec = None
+
+__all__ = [
+    "BACKENDS",
+    "Decoder",
+    "get_decoder",
+    "loads",
+    "schema_decoder",
+]
+
+Decoder = Callable[[bytes], Any]
+
+BACKENDS: Dict[str, Decoder] = {}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+if msgspec is not None:
+    BACKENDS["msgspec"] = msgspec.json.decode
+BACKENDS["json"] = json.loads
+
+
+def get_decoder(name: str = None) -> Decoder:
+    """The decoder of backend ``name``, or the fastest one installed.
+    Backends are preferred in the order orjson, msgspec, then the
+    stdlib ``json``, which is always available.
+    """
+    if name is None:
+        return next(iter(BACKENDS.values()))
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError("JSON backend {!r} is not installed".format(name))
+
+
+loads = get_decoder()
+
+
+def _struct(name: str, keys: Sequence[str]) -> type:
+    """msgspec ``Struct`` type holding only the top-level ``keys`` of an
+    object, whatever their values. Absent keys stay unset and are omitted
+    when converted back to builtins, as ``project`` leaves out paths it
+    cannot follow.
+    """
+    return msgspec.defstruct(
+        name, [(key, Any, msgspec.UNSET) for key in keys],
+        omit_defaults=True)
+
+
+def schema_decoder(fields: Sequence[Sequence[str]]) -> Decoder:
+    """Decoder of a JSON list keeping only ``fields`` (key paths) of each
+    item, e.g. ``[("name",), ("license", "key")]``, as ``project`` would.
+    With msgspec installed the top-level keys no field starts with are
+    skipped while parsing instead of being built and thrown away;
+    otherwise the list is decoded by ``loads``. Either way each item is
+    then reduced with ``project``, so both give the same result.
+    Equal fields give the same decoder, so requests decoded with it can
+    be coalesced across clients.
+    Example
+    -------
+    >>> decode = schema_decoder([("name",), ("license", "key")])
+    >>> decode(b'[{"name": "a", "license": {"key": "mit", "url": "u"}}]')
+    [{'name': 'a', 'license': {'key': 'mit'}}]
+    """
+    paths = tuple(dict.fromkeys(tuple(path) for path in fields))
+    return _schema_decoder(paths, msgspec is not None)
+
+
+@lru_cache(maxsize=None)
+def _schema_decoder(paths: Tuple[Tuple[str, ...], ...],
+                    use_msgspec: bool) -> Decoder:
+    """Build the decoder of ``schema_decoder`` for normalized paths."""
+    def fallback(data: bytes) -> List[Dict]:
+        """Decode everything, then project each item."""
+        return [project(item, paths) for item in loads(data)]
+
+    if not use_msgspec:
+        return fallback
+    keys = list(dict.fromkeys(path[0] for path in paths))
+    decoder = msgspec.json.Decoder(List[_struct("Item", keys)])
+
+    def decode(data: bytes) -> List[Dict]:
+        """Decode the kept keys only, then project each item."""
+        try:
+            items = msgspec.to_builtins(decoder.decode(data))
+        except msgspec.ValidationError:  # e.g. items that are not objects
+            return fallback(data)
+        return [project(item, paths) for item in items]
+
+    return decode
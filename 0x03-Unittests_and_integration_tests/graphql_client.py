@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""A github org client backed by batched GraphQL queries
+"""
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from client import GithubOrgClient
+from utils import (
+    ColumnarRecords,
+    post_json,
+    project,
+    ttl_memoize,
+)
+
+__all__ = [
+    "GithubGraphQLClient",
+    "GraphQLError",
+]
+
+_ORG_QUERY = """
+  o{i}: organization(login: $l{i}) {{
+    login
+    name
+    description
+    url
+    repositories(first: {page_size}, after: $c{i}, privacy: PUBLIC) {{
+      totalCount
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{ name licenseInfo {{ key }} }}
+    }}
+  }}"""
+
+
+class GraphQLError(RuntimeError):
+    """Raised when a GraphQL answer carries errors.
+    Raised for a whole scan, ``errors`` holds the error of each org that
+    failed and ``results`` what the other orgs resolved to.
+    """
+
+    def __init__(self, message: str, errors: Dict[str, Exception] = None,
+                 results: Dict[str, Tuple[Dict, List[Dict]]] = None) -> None:
+        """Init method of GraphQLError"""
+        super().__init__(message)
+        self.errors = errors or {}
+        self.results = results or {}
+
+
+class GithubGraphQLClient(GithubOrgClient):
+    """A Github org client that reads through the GraphQL API.
+    Org metadata, repo names and license keys of up to ``BATCH_SIZE`` orgs
+    come back from one query, ``PAGE_SIZE`` repos per org at a time, so
+    the REST calls for the org, its ``repos_url`` and each page collapse
+    into about one query per hundred repos. ``org``, ``repos_payload`` and
+    ``public_repos`` keep the ``GithubOrgClient`` shape; repos carry only
+    ``name`` and ``license.key``. Nothing goes through the REST endpoints,
+    so the ``cache``, ``coalescer`` and ``snapshot`` options are refused.
+    """
+    GRAPHQL_URL = "https://api.github.com/graphql"
+    BATCH_SIZE = 10
+    PAGE_SIZE = 100
+
+    def __init__(self, org_name: str, token: str = None,
+                 **options: Any) -> None:
+        """Init method of GithubGraphQLClient.
+        ``token`` is sent as a bearer token; the other options are those
+        of ``GithubOrgClient``, except ``cache``, ``coalescer`` and
+        ``snapshot``, which only apply to REST fetches.
+        """
+        for option in ("cache", "coalescer", "snapshot"):
+            if options.get(option) is not None:
+                raise TypeError("{} does not support {!r}".format(
+                    type(self).__name__, option))
+        super().__init__(org_name, **options)
+        self._token = token
+
+    @classmethod
+    def _query(cls, count: int) -> str:
+        """GraphQL document asking for ``count`` aliased orgs."""
+        variables = ", ".join(
+            "$l{0}: String!, $c{0}: String".format(i) for i in range(count))
+        fields = "".join(_ORG_QUERY.format(i=i, page_size=cls.PAGE_SIZE)
+                         for i in range(count))
+        return "query({}) {{{}\n}}".format(variables, fields)
+
+    @staticmethod
+    def _errors_by_alias(errors: List[Dict],
+                         count: int) -> Dict[str, List[str]]:
+        """Messages of ``errors`` by the alias (``oN``) they belong to.
+        Errors without a path into one alias belong to every alias.
+        """
+        aliases = ["o{}".format(i) for i in range(count)]
+        messages: Dict[str, List[str]] = {}
+        for error in errors:
+            path = error.get("path") or [None]
+            for alias in [path[0]] if path[0] in aliases else aliases:
+                messages.setdefault(alias, []).append(
+                    error.get("message", ""))
+        return messages
+
+    @classmethod
+    def fetch_orgs(
+        cls,
+        org_names: Iterable[str],
+        token: str = None,
+        return_exceptions: bool = False,
+        **options: Any,
+    ) -> Dict[str, Union[Tuple[Dict, List[Dict]], GraphQLError]]:
+        """Org metadata and public repos of every org, keyed by login.
+        Orgs are queried ``BATCH_SIZE`` at a time; orgs with more repos
+        are paged by cursor in follow-up queries until none remain.
+        Orgs an answer has no data or errors for fail on their own, the
+        others are still read: with ``return_exceptions`` their entry is
+        their ``GraphQLError``, otherwise one ``GraphQLError`` carrying
+        every result is raised once the scan is over.
+        ``options`` are passed on to ``post_json``.
+        """
+        headers = options.pop("headers", {})
+        if token is not None:
+            headers = dict(headers, Authorization="bearer {}".format(token))
+        results: Dict[str, Tuple[Dict, List[Dict]]] = {}
+        errors: Dict[str, GraphQLError] = {}
+        org_names = list(dict.fromkeys(org_names))
+        pending = [(name, None) for name in org_names]
+
+        while pending:
+            batch, pending = pending[:cls.BATCH_SIZE], \
+                pending[cls.BATCH_SIZE:]
+            variables: Dict[str, Any] = {}
+            for i, (name, cursor) in enumerate(batch):
+                variables["l{}".format(i)] = name
+                variables["c{}".format(i)] = cursor
+            answer = post_json(
+                cls.GRAPHQL_URL,
+                {"query": cls._query(len(batch)), "variables": variables},
+                headers=headers,
+                **options,
+            )
+            data = answer.get("data") or {}
+            messages = cls._errors_by_alias(answer.get("errors") or [],
+                                            len(batch))
+
+            for i, (name, _) in enumerate(batch):
+                alias = "o{}".format(i)
+                node = data.get(alias)
+                if node is None or alias in messages:
+                    results.pop(name, None)
+                    errors[name] = GraphQLError("{}: {}".format(
+                        name, "; ".join(messages.get(alias, ["no data"]))))
+                    continue
+                repositories = node.pop("repositories")
+                org, repos = results.setdefault(name, (node, []))
+                org["public_repos"] = repositories["totalCount"]
+                repos.extend({
+                    "name": repo["name"],
+                    "license": repo["licenseInfo"],
+                } for repo in repositories["nodes"])
+                page_info = repositories["pageInfo"]
+                if page_info["hasNextPage"]:
+                    pending.append((name, page_info["endCursor"]))
+        if errors and not return_exceptions:
+            raise GraphQLError("; ".join(map(str, errors.values())),
+                               errors, results)
+        return {name: results.get(name) or errors[name]
+                for name in org_names}
+
+    @classmethod
+    def fetch_many(
+        cls,
+        org_names: Iterable[str],
+        license: str = None,
+        token: str = None,
+        return_exceptions: bool = False,
+        **options: Any,
+    ) -> Dict[str, Union[List[str], GraphQLError]]:
+        """Public repos of many orgs, through batched queries.
+        Failed orgs are handled as by ``fetch_orgs``.
+        """
+        def names(result: Tuple[Dict, List[Dict]]) -> List[str]:
+            """Names of the repos of one org with the license."""
+            return [repo["name"] for repo in result[1]
+                    if license is None or cls.has_license(repo, license)]
+
+        try:
+            results = cls.fetch_orgs(org_names, token, return_exceptions,
+                                     **options)
+        except GraphQLError as error:
+            error.results = {name: names(result)
+                             for name, result in error.results.items()}
+            raise
+        return {name: result if isinstance(result, GraphQLError)
+                else names(result) for name, result in results.items()}
+
+    @ttl_memoize(ttl=lambda self: self._ttl)
+    def _snapshot(self) -> Tuple[Dict, Sequence[Dict]]:
+        """Memoize org metadata and repos, fetched together"""
+        try:
+            org, repos = self.fetch_orgs(
+                [self._org_name], self._token, decoder=self._decoder,
+                **self._options)[self._org_name]
+        except GraphQLError as error:
+            raise error.errors.get(self._org_name, error) from None
+        if self._fields is not None:
+            repos = ColumnarRecords(repos, self._fields)
+        return org, repos
+
+    @property
+    def _public_repos_url(self) -> str:
+        """REST URL of the public repos, without fetching the org"""
+        return self.ORG_URL.format(org=self._org_name) + "/repos"
+
+    @property
+    def org(self) -> Dict:
+        """Org metadata"""
+        return self._snapshot[0]
+
+    @property
+    def repos_payload(self) -> Sequence[Dict]:
+        """Repos payload"""
+        return self._snapshot[1]
+
+    def invalidate(self) -> None:
+        """Forget the memoized org and repos payloads"""
+        type(self)._snapshot.invalidate(self)
+
+    def iter_repos(self, fields: Sequence[Sequence] = None) -> Iterator[Dict]:
+        """Iterate over repos, keeping only ``fields`` when given."""
+        for repo in self.repos_payload:
+            yield repo if fields is None else project(repo, fields)
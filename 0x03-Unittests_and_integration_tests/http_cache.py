@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Persistent store for conditional (ETag / Last-Modified) HTTP requests.
+"""
+import sqlite3
+import threading
+from typing import (
+    NamedTuple,
+    Optional,
+)
+
+__all__ = [
+    "CacheEntry",
+    "SQLiteCache",
+]
+
+
+class CacheEntry(NamedTuple):
+    """A cached response body and the validators needed to revalidate it.
+    """
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    link: Optional[str] = None
+
+
+class SQLiteCache:
+    """Size-bounded LRU response cache kept in a sqlite file.
+    Entries survive process restarts; once the stored bodies exceed
+    ``max_bytes`` the least recently used ones are evicted.
+    Example
+    -------
+    >>> cache = SQLiteCache(":memory:")
+    >>> cache.set("https://x.io", CacheEntry(b"[]", etag='"abc"'))
+    >>> cache.get("https://x.io").etag
+    '"abc"'
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Init method of SQLiteCache"""
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " body BLOB NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " link TEXT,"
+                " size INTEGER NOT NULL,"
+                " accessed INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed"
+                " ON responses (accessed)"
+            )
+        self._clock = self._db.execute(
+            "SELECT COALESCE(MAX(accessed), 0) FROM responses").fetchone()[0]
+
+    def _tick(self) -> int:
+        """Next value of the access clock used to order entries."""
+        self._clock += 1
+        return self._clock
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the entry stored for ``url`` and mark it recently used."""
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, link"
+                " FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE url = ?",
+                (self._tick(), url),
+            )
+        return CacheEntry(bytes(row[0]), *row[1:])
+
+    def set(self, url: str, entry: CacheEntry) -> None:
+        """Store ``entry`` for ``url`` and evict down to ``max_bytes``."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, entry.body, entry.etag, entry.last_modified,
+                 entry.link, len(entry.body), self._tick()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under ``max_bytes``."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT url, size FROM responses ORDER BY accessed").fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+
+    def __len__(self) -> int:
+        """Number of stored entries."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
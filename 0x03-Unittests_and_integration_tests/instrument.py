@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Pluggable metrics for HTTP calls, decoding and memoization.
+
+Hooks registered with ``add_hook`` receive ``(metric, value, tags)`` for
+every measurement of the process; timings are in seconds. Metrics:
+
+connect        DNS lookup, TCP connect and TLS handshake of a connection
+ttfb           from sending a request until its response headers arrived
+download       reading the response body
+decode         decoding the JSON body
+bytes          size of the response body
+retry          one retry of a failed call
+memoize.hit    a memoized value was reused
+memoize.miss   a memoized value was computed
+filter         the repo filter of ``GithubOrgClient.public_repos``
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+__all__ = [
+    "HistogramAggregator",
+    "Hook",
+    "InstrumentedAdapter",
+    "add_hook",
+    "emit",
+    "enabled",
+    "remove_hook",
+    "timed",
+]
+
+Hook = Callable[[str, float, Dict[str, str]], None]
+
+_hooks: List[Hook] = []
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: Hook) -> Hook:
+    """Send every metric of the process to ``hook`` too; returns it."""
+    with _hooks_lock:
+        _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Hook) -> None:
+    """Stop sending metrics to ``hook``."""
+    with _hooks_lock:
+        _hooks.remove(hook)
+
+
+def enabled() -> bool:
+    """Whether any hook is listening, so callers can skip measuring."""
+    return bool(_hooks)
+
+
+def emit(metric: str, value: float, **tags: str) -> None:
+    """Pass one measurement to every hook."""
+    for hook in tuple(_hooks):
+        hook(metric, value, tags)
+
+
+@contextmanager
+def timed(metric: str, **tags: str) -> Iterator[None]:
+    """Emit the time spent in the block as ``metric``, if anyone listens."""
+    if not _hooks:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit(metric, time.perf_counter() - start, **tags)
+
+
+class _TimedConnection(HTTPConnection):
+    """HTTP connection emitting the time it took to connect."""
+
+    def connect(self) -> None:
+        """Connect, timed as ``connect``."""
+        with timed("connect", host=self.host):
+            super().connect()
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection emitting the time it took to connect."""
+
+    def connect(self) -> None:
+        """Connect and handshake, timed as ``connect``."""
+        with timed("connect", host=self.host):
+            super().connect()
+
+
+class _TimedPool(HTTPConnectionPool):
+    """HTTP pool of timed connections."""
+    ConnectionCls = _TimedConnection
+
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    """HTTPS pool of timed connections."""
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose new connections emit ``connect`` timings."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        """Build the pool manager with timed connection pools."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedPool,
+            "https": _TimedHTTPSPool,
+        }
+
+
+class HistogramAggregator:
+    """In-process hook keeping a log-scale histogram per metric and tags.
+    Buckets grow by a factor of two, so percentiles are estimated to
+    within a factor of two, clamped to the observed minimum and maximum.
+    Example
+    -------
+    >>> histograms = add_hook(HistogramAggregator())
+    >>> emit("decode", 0.002)
+    >>> histograms.summary()["decode"]["count"]
+    1
+    >>> remove_hook(histograms)
+    """
+    BOUNDS = tuple(2.0 ** exponent for exponent in range(-24, 41))
+
+    def __init__(self, by_tags: Sequence[str] = ()) -> None:
+        """Init method of HistogramAggregator.
+        Measurements are kept apart by the values of the ``by_tags`` tags,
+        e.g. ``("host",)``; other tags are ignored.
+        """
+        self.by_tags = tuple(by_tags)
+        self._lock = threading.Lock()
+        self._series: Dict[str, List] = {}
+
+    def _name(self, metric: str, tags: Dict[str, str]) -> str:
+        """Series name of ``metric`` with the tracked tags."""
+        labels = ",".join("{}={}".format(tag, tags[tag])
+                          for tag in self.by_tags if tag in tags)
+        return "{}{{{}}}".format(metric, labels) if labels else metric
+
+    def __call__(self, metric: str, value: float,
+                 tags: Dict[str, str]) -> None:
+        """Record one measurement."""
+        name = self._name(metric, tags)
+        bucket = bisect.bisect_left(self.BOUNDS, value)
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = \
+                    [0, 0.0, value, value, [0] * (len(self.BOUNDS) + 1)]
+            series[0] += 1
+            series[1] += value
+            series[2] = min(series[2], value)
+            series[3] = max(series[3], value)
+            series[4][bucket] += 1
+
+    def _percentile(self, series: List, q: float) -> float:
+        """Estimated ``q``-th percentile of one series."""
+        count, _, low, high, buckets = series
+        rank, seen = q / 100 * count, 0
+        for bucket, hits in enumerate(buckets):
+            seen += hits
+            if hits and seen >= rank:
+                bound = self.BOUNDS[bucket] if bucket < len(self.BOUNDS) \
+                    else high
+                return max(low, min(high, bound))
+        return high
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, sum, min, max, mean, p50 and p99 of every series."""
+        with self._lock:
+            series = {name: [*values[:4], list(values[4])]
+                      for name, values in self._series.items()}
+        return {
+            name: {
+                "count": values[0],
+                "sum": values[1],
+                "min": values[2],
+                "max": values[3],
+                "mean": values[1] / values[0],
+                "p50": self._percentile(values, 50),
+                "p99": self._percentile(values, 99),
+            }
+            for name, values in sorted(series.items())
+        }
+
+    def dump(self) -> str:
+        """Text table of ``summary``, one line per series."""
+        columns: Tuple[str, ...] = ("count", "sum", "mean", "p50", "p99",
+                                    "max")
+        lines = ["{:<32}".format("metric") + "".join(
+            "{:>12}".format(column) for column in columns)]
+        for name, stats in self.summary().items():
+            lines.append("{:<32}".format(name) + "".join(
+                "{:>12.6g}".format(stats[column]) for column in columns))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Forget every measurement."""
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compiled key paths into nested maps, shared by utils and decoders.
+"""
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+__all__ = [
+    "compile_path",
+    "project",
+]
+
+
+@lru_cache(maxsize=256)
+def _compile(keys: Tuple) -> Callable[[Mapping], Any]:
+    """Build the getter of ``compile_path`` for a tuple of keys."""
+    if len(keys) == 1:
+        key, = keys
+
+        def getter(nested_map: Mapping) -> Any:
+            """Value at the compiled path."""
+            if type(nested_map) is not dict and \
+                    not isinstance(nested_map, Mapping):
+                raise KeyError(key)
+            return nested_map[key]
+    elif len(keys) == 2:
+        first, second = keys
+
+        def getter(nested_map: Mapping) -> Any:
+            """Value at the compiled path."""
+            if type(nested_map) is not dict and \
+                    not isinstance(nested_map, Mapping):
+                raise KeyError(first)
+            nested_map = nested_map[first]
+            if type(nested_map) is not dict and \
+                    not isinstance(nested_map, Mapping):
+                raise KeyError(second)
+            return nested_map[second]
+    else:
+        def getter(nested_map: Mapping) -> Any:
+            """Value at the compiled path."""
+            for key in keys:
+                if type(nested_map) is not dict and \
+                        not isinstance(nested_map, Mapping):
+                    raise KeyError(key)
+                nested_map = nested_map[key]
+            return nested_map
+    return getter
+
+
+def compile_path(path: Sequence) -> Callable[[Mapping], Any]:
+    """Precompile a key path into a reusable getter.
+    The getter behaves exactly like ``access_nested_map`` with that path,
+    including its ``KeyError``s, but checks plain ``dict`` levels by type
+    before falling back to the slower ``Mapping`` check.
+    Example
+    -------
+    >>> license_key = compile_path(("license", "key"))
+    >>> license_key({"license": {"key": "mit"}})
+    'mit'
+    """
+    return _compile(tuple(path))
+
+
+def project(nested_map: Mapping, paths: Iterable[Sequence]) -> Dict:
+    """Copy of a nested map reduced to the given key paths.
+    Paths that cannot be followed are left out of the copy.
+    Example
+    -------
+    >>> repo = {"name": "x", "forks": 3, "license": {"key": "mit", "n": 1}}
+    >>> project(repo, [("name",), ("license", "key"), ("owner", "id")])
+    {'name': 'x', 'license': {'key': 'mit'}}
+    """
+    projected: Dict = {}
+    for path in paths:
+        try:
+            value = compile_path(path)(nested_map)
+        except KeyError:
+            continue
+        target = projected
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    return projected
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Rate-limit aware scheduling of GitHub API calls.
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Mapping,
+    Optional,
+)
+
+__all__ = [
+    "PRIORITY_ORG",
+    "PRIORITY_PAGES",
+    "RateLimitScheduler",
+    "get_scheduler",
+]
+
+PRIORITY_ORG = 0
+PRIORITY_PAGES = 1
+
+
+def _header_number(headers: Mapping, name: str) -> Optional[float]:
+    """Numeric value of header ``name``, or None when absent or invalid."""
+    value = headers.get(name)
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RateLimitScheduler:
+    """Rate-limit aware pacing shared by every client in a process.
+    Callers ``acquire`` a slot before each request and report the
+    response with ``update``. Slots are handed out lowest ``priority``
+    first, so org metadata (``PRIORITY_ORG``) goes ahead of bulk repo
+    pages (``PRIORITY_PAGES``).
+    The budget announced by ``X-RateLimit-Remaining`` is spent as fast as
+    callers ask, optionally smoothed by a local token bucket of
+    ``max_rate`` calls per second and ``burst`` size; once it is used up
+    every caller waits for ``X-RateLimit-Reset`` instead of failing. A
+    ``Retry-After`` answer pauses callers for the given number of seconds.
+    A rejection without either pauses them for ``DEFAULT_PAUSE`` seconds,
+    and never for less than ``MIN_PAUSE``, so a reset time already past
+    (e.g. from a skewed clock) cannot make callers resend in a tight loop.
+    """
+    DEFAULT_PAUSE = 60.0
+    MIN_PAUSE = 1.0
+
+    def __init__(
+        self,
+        max_rate: float = None,
+        burst: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Init method of RateLimitScheduler.
+        ``max_rate`` of None leaves pacing to the server's budget.
+        """
+        self.max_rate = max_rate
+        self.burst = burst
+        self.remaining: Optional[int] = None
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._tickets = itertools.count()
+        self._tokens = float(burst)
+        self._refilled = clock()
+        self._reset_at: Optional[float] = None
+        self._paused_until = 0.0
+
+    def _delay(self, now: float) -> float:
+        """Seconds until the next slot may be handed out."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.remaining is not None and self.remaining <= 0:
+            if self._reset_at is not None and now < self._reset_at:
+                return self._reset_at - now
+            self.remaining = None
+        if self.max_rate is not None:
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._refilled) * self.max_rate)
+            self._refilled = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.max_rate
+        return 0.0
+
+    def acquire(self, priority: int = PRIORITY_ORG) -> None:
+        """Block until this caller may send one request."""
+        with self._cond:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] != ticket:
+                        self._cond.wait()
+                        continue
+                    delay = self._delay(self._clock())
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self.max_rate is not None:
+                    self._tokens -= 1
+                if self.remaining is not None:
+                    self.remaining -= 1
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def update(self, response: Any) -> bool:
+        """Record the budget reported by ``response``.
+        Returns True when the request was rejected by the rate limit and
+        should be sent again once ``acquire`` lets it through.
+        """
+        headers = getattr(response, "headers", None) or {}
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset = _header_number(headers, "X-RateLimit-Reset")
+        retry_after = _header_number(headers, "Retry-After")
+        limited = response.status_code in (403, 429) and (
+            retry_after is not None or remaining == 0)
+
+        with self._cond:
+            now = self._clock()
+            if reset is not None:
+                reset_at = now + max(0.0, reset - self._wall_clock())
+                if self._reset_at is None or reset_at > self._reset_at + 1:
+                    # A new window: the server's count replaces ours.
+                    self.remaining = None
+                self._reset_at = reset_at
+            if remaining is not None:
+                # Responses to requests still in flight may be stale, so
+                # never trust a count higher than what we have left.
+                self.remaining = int(remaining) if self.remaining is None \
+                    else min(self.remaining, int(remaining))
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until,
+                                         now + retry_after)
+            elif limited and self._reset_at is None:
+                self._paused_until = max(self._paused_until,
+                                         now + self.DEFAULT_PAUSE)
+            elif limited and self._reset_at < now + self.MIN_PAUSE:
+                self._paused_until = max(self._paused_until,
+                                         now + self.MIN_PAUSE)
+            self._cond.notify_all()
+        return limited
+
+
+_scheduler: Optional[RateLimitScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """Return the process-wide scheduler, creating it on first use.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RateLimitScheduler()
+    return _scheduler
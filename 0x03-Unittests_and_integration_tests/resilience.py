@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Retry with backoff and per-host circuit breaking for HTTP calls.
+"""
+import random
+import threading
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    Type,
+)
+from urllib.parse import urlsplit
+
+import requests
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RetryPolicy",
+    "get_breaker",
+]
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose circuit is open."""
+
+
+class RetryPolicy:
+    """Bounded retries spaced by "decorrelated jitter" backoff.
+    Each delay is drawn uniformly between ``base`` and three times the
+    previous delay, capped at ``cap`` seconds, which spreads retries of
+    many callers apart while still growing exponentially.
+    Example
+    -------
+    >>> policy = RetryPolicy(retries=3, base=0.1, cap=1.0)
+    >>> delays = list(policy.delays())
+    >>> len(delays), all(0.1 <= delay <= 1.0 for delay in delays)
+    (3, True)
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        base: float = 0.1,
+        cap: float = 10.0,
+        statuses: Tuple[int, ...] = (500, 502, 503, 504),
+        exceptions: Tuple[Type[BaseException], ...] = (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ),
+    ) -> None:
+        """Init method of RetryPolicy"""
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self.statuses = statuses
+        self.exceptions = exceptions
+
+    def delays(self) -> Iterator[float]:
+        """Yield the delay before each retry, at most ``retries`` times."""
+        delay = self.base
+        for _ in range(self.retries):
+            delay = min(self.cap, random.uniform(self.base, delay * 3))
+            yield delay
+
+    def should_retry(self, response: requests.Response) -> bool:
+        """Whether ``response`` is a transient failure worth retrying."""
+        status = response.status_code
+        return isinstance(status, int) and status in self.statuses
+
+
+class CircuitBreaker:
+    """Fail fast while a host keeps failing.
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls raise ``CircuitOpenError`` without touching the network. Once
+    ``reset_timeout`` seconds have passed a single probe is let through:
+    its success closes the circuit, its failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init method of CircuitBreaker"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go ahead."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and \
+                    self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError("circuit open, failing fast")
+
+    def success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self) -> None:
+        """Record a failed call."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or \
+                    self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker of the host of ``url``.
+    """
+    host = urlsplit(url).netloc
+    breaker: Optional[CircuitBreaker] = _breakers.get(host)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(host, CircuitBreaker())
+    return breaker
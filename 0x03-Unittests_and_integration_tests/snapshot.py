@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Local snapshot of the repos of each org, refreshed by deltas.
+"""
+import json
+import sqlite3
+import threading
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+__all__ = [
+    "SnapshotStore",
+]
+
+
+class SnapshotStore:
+    """Repos of each org kept in a sqlite file between runs.
+    Each repo is stored whole, alongside its ``updated_at`` and
+    ``pushed_at`` timestamps. Each stored org also gets a row of its own
+    holding its ``watermark``, the newest ``updated_at`` seen so far, or
+    an empty string when none was: a refresh only needs the repos
+    updated since then, which ``GithubOrgClient`` asks for newest first
+    and stops reading at the first older one. Repos keep the order they
+    were first stored in.
+    Example
+    -------
+    >>> store = SnapshotStore(":memory:")
+    >>> store.upsert("google", [{"name": "a", "updated_at": "2020-01-01"}])
+    >>> store.watermark("google"), store.names("google")
+    ('2020-01-01', ['a'])
+    """
+
+    def __init__(self, path: str) -> None:
+        """Init method of SnapshotStore"""
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS repos ("
+                " org TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " updated_at TEXT,"
+                " pushed_at TEXT,"
+                " body TEXT NOT NULL,"
+                " PRIMARY KEY (org, name))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS orgs ("
+                " org TEXT PRIMARY KEY,"
+                " watermark TEXT NOT NULL)"
+            )
+
+    def watermark(self, org: str) -> Optional[str]:
+        """Newest ``updated_at`` stored for ``org``, an empty string if
+        none of its repos had one, or None if ``org`` was never stored.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT watermark FROM orgs WHERE org = ?", (org,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def _upsert(self, org: str, repos: Iterable[Dict]) -> None:
+        """``upsert`` within the caller's lock and transaction."""
+        rows = [
+            (org, repo["name"], repo.get("updated_at"),
+             repo.get("pushed_at"), json.dumps(repo))
+            for repo in repos
+        ]
+        self._db.executemany(
+            "INSERT INTO repos VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (org, name) DO UPDATE SET"
+            " updated_at = excluded.updated_at,"
+            " pushed_at = excluded.pushed_at,"
+            " body = excluded.body",
+            rows,
+        )
+        newest = max((row[2] for row in rows if row[2]), default="")
+        self._db.execute(
+            "INSERT INTO orgs VALUES (?, ?)"
+            " ON CONFLICT (org) DO UPDATE SET"
+            " watermark = MAX(watermark, excluded.watermark)",
+            (org, newest),
+        )
+
+    def upsert(self, org: str, repos: Iterable[Dict]) -> None:
+        """Store ``repos`` of ``org``, replacing those with the same name.
+        Replaced repos keep their position; new ones are added last.
+        """
+        with self._lock, self._db:
+            self._upsert(org, repos)
+
+    def replace(self, org: str, repos: Iterable[Dict]) -> None:
+        """Make ``repos`` the whole snapshot of ``org``, in one transaction
+        so readers never see the org emptied and a failure keeps the old
+        snapshot.
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM repos WHERE org = ?", (org,))
+            self._db.execute("DELETE FROM orgs WHERE org = ?", (org,))
+            self._upsert(org, repos)
+
+    def repos(self, org: str) -> List[Dict]:
+        """Every stored repo of ``org``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT body FROM repos WHERE org = ? ORDER BY rowid", (org,)
+            ).fetchall()
+        return [json.loads(body) for body, in rows]
+
+    def names(self, org: str) -> List[str]:
+        """Names of the stored repos of ``org``, without decoding them."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name FROM repos WHERE org = ? ORDER BY rowid", (org,)
+            ).fetchall()
+        return [name for name, in rows]
+
+    def clear(self, org: str = None) -> None:
+        """Forget the repos of ``org``, or of every org."""
+        with self._lock, self._db:
+            if org is None:
+                self._db.execute("DELETE FROM repos")
+                self._db.execute("DELETE FROM orgs")
+            else:
+                self._db.execute("DELETE FROM repos WHERE org = ?", (org,))
+                self._db.execute("DELETE FROM orgs WHERE org = ?", (org,))
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
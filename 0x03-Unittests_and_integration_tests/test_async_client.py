@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Unit tests for AsyncGithubOrgClient class."""
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+from async_client import AsyncGithubOrgClient
+from coalesce import Coalescer
+from fixtures import TEST_PAYLOAD
+
+ORG_PAYLOAD, REPOS_PAYLOAD, EXPECTED_REPOS, APACHE2_REPOS = TEST_PAYLOAD[0]
+
+
+def fake_get_json_page(url, **options):
+    """Serve the fixture org payload, or fixture repos three per page."""
+    if "/repos" not in url:
+        return dict(ORG_PAYLOAD, login=url.rsplit("/", 1)[1]), {}
+    if "&page=" not in url:
+        last = "{}&page=3".format(url)
+        return REPOS_PAYLOAD[:3], {"last": {"url": last}}
+    page = int(url.rsplit("page=", 1)[1])
+    return REPOS_PAYLOAD[(page - 1) * 3:page * 3], {}
+
+
+@patch('async_client.get_json_page', side_effect=fake_get_json_page)
+class TestAsyncGithubOrgClient(unittest.IsolatedAsyncioTestCase):
+    """Test case for AsyncGithubOrgClient class."""
+
+    async def test_public_repos(self, mock_get_json_page):
+        """Test every page is fetched and filtered by license."""
+        client = AsyncGithubOrgClient("google")
+
+        self.assertEqual(await client.public_repos(), EXPECTED_REPOS)
+        self.assertEqual(await client.public_repos("apache-2.0"),
+                         APACHE2_REPOS)
+        self.assertEqual(mock_get_json_page.call_count, 4)
+
+    async def test_concurrent_org_is_fetched_once(self, mock_get_json_page):
+        """Test concurrent awaiters share a single org fetch."""
+        client = AsyncGithubOrgClient("google")
+        results = await asyncio.gather(*(client.org() for _ in range(5)))
+
+        self.assertEqual(len({id(result) for result in results}), 1)
+        mock_get_json_page.assert_called_once()
+
+    async def test_coalesced_across_clients(self, mock_get_json_page):
+        """Test clients sharing a coalescer share fetches of one org."""
+        coalescer = Coalescer()
+        clients = [AsyncGithubOrgClient("google", coalescer=coalescer)
+                   for _ in range(5)]
+        results = await asyncio.gather(*(c.public_repos() for c in clients))
+
+        self.assertEqual(results, [EXPECTED_REPOS] * 5)
+        self.assertEqual(mock_get_json_page.call_count, 4)
+
+    async def test_fetch_many(self, mock_get_json_page):
+        """Test many orgs are scanned and keyed by name."""
+        orgs = ["org{}".format(i) for i in range(20)]
+        result = await AsyncGithubOrgClient.fetch_many(
+            orgs, license="apache-2.0", concurrency=4)
+
+        self.assertEqual(list(result), orgs)
+        self.assertTrue(all(r == APACHE2_REPOS for r in result.values()))
+
+    async def test_fetch_many_bounds_concurrency(self, mock_get_json_page):
+        """Test no more than ``concurrency`` fetches run at once."""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def slow_get_json(url, **options):
+            """Track how many calls overlap."""
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            threading.Event().wait(0.01)
+            with lock:
+                state["running"] -= 1
+            return fake_get_json_page(url)
+
+        mock_get_json_page.side_effect = slow_get_json
+        await AsyncGithubOrgClient.fetch_many(
+            ["org{}".format(i) for i in range(12)], concurrency=3)
+        self.assertLessEqual(state["peak"], 3)
+
+    async def test_fetch_many_return_exceptions(self, mock_get_json_page):
+        """Test a failing org does not abort the scan."""
+        def failing(url, **options):
+            """Fail for one org only."""
+            if url.endswith("/broken"):
+                raise ValueError("boom")
+            return fake_get_json_page(url)
+
+        mock_get_json_page.side_effect = failing
+        result = await AsyncGithubOrgClient.fetch_many(
+            ["google", "broken"], return_exceptions=True)
+
+        self.assertEqual(result["google"], EXPECTED_REPOS)
+        self.assertIsInstance(result["broken"], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Unit tests for the benchmark harness and its fake GitHub API."""
+import unittest
+import requests
+import benchmark
+
+
+class TestFakeGithub(unittest.TestCase):
+    """Test case for the fake GitHub server."""
+
+    def test_paginated_listing(self):
+        """Test every synthetic repo is served once across the pages."""
+        with benchmark.serve() as server:
+            client = benchmark.GithubOrgClient("synthetic-250")
+            client.ORG_URL = server.base_url + "/orgs/{org}"
+            repos = client.public_repos()
+            mit = client.public_repos("mit")
+        self.assertEqual(len(repos), 250)
+        self.assertEqual(len(set(repos)), 250)
+        self.assertEqual(len(mit), 63)
+
+    def test_rate_limit(self):
+        """Test calls over budget are rejected with rate-limit headers."""
+        with benchmark.serve(rate_limit=1) as server:
+            url = server.base_url + "/orgs/synthetic-1"
+            first, second = requests.get(url), requests.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 403)
+        self.assertEqual(second.headers["X-RateLimit-Remaining"], "0")
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    """Test case for run_benchmarks."""
+
+    def test_rows(self):
+        """Test one row per mode and operation, plus has_license."""
+        rows = benchmark.run_benchmarks([20], repeats=2)
+        self.assertEqual(len(rows), 3 * 3 + 1)
+        self.assertEqual({row["mode"] for row in rows},
+                         {"sync", "threaded", "async", "-"})
+        for row in rows:
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+            self.assertGreater(row["items_per_s"], 0)
+        self.assertIn("has_license", benchmark.format_rows(rows))
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(samples, 50), 50)
+        self.assertEqual(benchmark.percentile(samples, 99), 99)
+        self.assertEqual(benchmark.percentile([3.0], 99), 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """Unit tests for GithubOrgClient class."""
+import json
+import threading
+import time
 import unittest
-from unittest.mock import patch, PropertyMock
+from unittest.mock import patch, MagicMock, Mock, PropertyMock
 from parameterized import parameterized, parameterized_class
 from client import GithubOrgClient
+from snapshot import SnapshotStore
+from utils import DEFAULT_TIMEOUT, compile_path
 from fixtures import TEST_PAYLOAD
 
 
@@ -42,7 +47,7 @@ class TestGithubOrgClient(unittest.TestCase):
             # Assert that the result matches the mocked payload
             self.assertEqual(result, payload["repos_url"])
 
-    @patch('client.get_json')
+    @patch('client.get_json_pages')
     def test_public_repos(self, mock_get_json):
         """Test that GithubOrgClient.public_repos returns the correct value."""
 
@@ -60,6 +65,187 @@ class TestGithubOrgClient(unittest.TestCase):
             mock_get_json.called_with_once()
             mock_public.called_with_once()
 
+    def test_injected_session(self):
+        """Test a custom session is used for every request."""
+        session = Mock()
+        session.get.return_value.content = b'{"login": "google"}'
+        client = GithubOrgClient("google", session=session)
+
+        self.assertEqual(client.org, {"login": "google"})
+        session.get.assert_called_once_with(
+            client.ORG_URL.format(org="google"), timeout=DEFAULT_TIMEOUT)
+
+    def test_concurrent_org_fetches_once(self):
+        """Test concurrent readers of org trigger a single get_json."""
+        release = threading.Event()
+
+        def slow_get_json(*args, **kwargs):
+            """Block until every reader is waiting."""
+            release.wait(5)
+            return {"login": "google"}
+
+        with patch('client.get_json', side_effect=slow_get_json) as mock:
+            client = GithubOrgClient("google")
+            threads = [threading.Thread(target=lambda: client.org)
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            release.set()
+            for thread in threads:
+                thread.join()
+            mock.assert_called_once()
+
+    @patch('client.get_json', side_effect=[{"v": 1}, {"v": 2}])
+    def test_invalidate(self, mock_get_json):
+        """Test invalidate makes the next read refetch."""
+        client = GithubOrgClient("google")
+        self.assertEqual(client.org, {"v": 1})
+        client.invalidate()
+        self.assertEqual(client.org, {"v": 2})
+
+    @patch('client.get_json_pages')
+    def test_license_index(self, mock_get_json_pages):
+        """Test repeated license queries reuse one index per payload."""
+        mock_get_json_pages.side_effect = [
+            [{"name": "a", "license": {"key": "mit"}},
+             {"name": "b", "license": None},
+             {"name": "c"},
+             {"name": "d", "license": {"key": "mit"}}],
+            [{"name": "e", "license": {"key": "mit"}}],
+        ]
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock, return_value="url"), \
+                patch('client._license_key',
+                      wraps=compile_path(("license", "key"))) as mock_access:
+            client = GithubOrgClient("google")
+            self.assertEqual(client.public_repos("mit"), ["a", "d"])
+            self.assertEqual(client.public_repos("apache-2.0"), [])
+            self.assertEqual(client.public_repos("mit"), ["a", "d"])
+            self.assertEqual(mock_access.call_count, 4)
+
+            type(client).repos_payload.invalidate(client)
+            self.assertEqual(client.public_repos("mit"), ["e"])
+            self.assertEqual(mock_access.call_count, 5)
+
+    @patch('client.iter_json_pages')
+    def test_public_repos_stream(self, mock_iter_json_pages):
+        """Test streaming mode filters projected repos without memoizing."""
+        mock_iter_json_pages.side_effect = lambda *a, **kw: iter([
+            {"name": "a", "license": {"key": "mit"}}, {"name": "b"}])
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock, return_value="url"):
+            client = GithubOrgClient("google")
+            self.assertEqual(client.public_repos(stream=True), ["a", "b"])
+            self.assertEqual(client.public_repos("mit", stream=True), ["a"])
+
+        _, kwargs = mock_iter_json_pages.call_args
+        self.assertEqual(kwargs["fields"], GithubOrgClient.LICENSE_FIELDS)
+        self.assertNotIn("_repos_payload_memo", vars(client))
+
+    @patch('client.iter_json_pages')
+    @patch('client.get_json_pages')
+    def test_snapshot_delta_refresh(self, mock_get_json_pages,
+                                    mock_iter_json_pages):
+        """Test refreshes only read repos updated since the snapshot."""
+        mock_get_json_pages.return_value = [
+            {"name": "a", "updated_at": "2024-01-01T00:00:00Z"},
+            {"name": "b", "updated_at": "2024-01-02T00:00:00Z"},
+        ]
+        read = []
+
+        def listing(*args, **kwargs):
+            """Yield the listing newest first, recording what was read."""
+            for repo in [
+                {"name": "c", "updated_at": "2024-01-04T00:00:00Z",
+                 "license": {"key": "mit"}},
+                {"name": "a", "updated_at": "2024-01-03T00:00:00Z",
+                 "license": {"key": "mit"}},
+                {"name": "b", "updated_at": "2024-01-02T00:00:00Z"},
+                {"name": "old", "updated_at": "2023-01-01T00:00:00Z"},
+            ]:
+                read.append(repo["name"])
+                yield repo
+        mock_iter_json_pages.side_effect = listing
+
+        store = SnapshotStore(":memory:")
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock, return_value="url"):
+            client = GithubOrgClient("google", snapshot=store)
+            self.assertEqual(client.public_repos(), ["a", "b"])
+            mock_iter_json_pages.assert_not_called()
+
+            client.invalidate()
+            self.assertEqual(client.public_repos(), ["a", "b", "c"])
+            self.assertEqual(client.public_repos("mit"), ["a", "c"])
+
+        mock_get_json_pages.assert_called_once()
+        self.assertEqual(read, ["c", "a", "b", "old"])
+        url = mock_iter_json_pages.call_args[0][0]
+        self.assertIn("sort=updated", url)
+        self.assertIn("direction=desc", url)
+        self.assertEqual(store.watermark("google"), "2024-01-04T00:00:00Z")
+
+    @patch('client.iter_json_pages',
+           side_effect=lambda *args, **kwargs: (repo for repo in []))
+    @patch('client.get_json_pages', return_value=[])
+    def test_snapshot_of_empty_org(self, mock_get_json_pages,
+                                   mock_iter_json_pages):
+        """Test an org without repos is not listed in full again."""
+        store = SnapshotStore(":memory:")
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock, return_value="url"):
+            client = GithubOrgClient("empty", snapshot=store)
+            self.assertEqual(client.public_repos(), [])
+            client.invalidate()
+            self.assertEqual(client.public_repos(), [])
+
+        mock_get_json_pages.assert_called_once()
+        mock_iter_json_pages.assert_called_once()
+
+    def test_public_repos_many(self):
+        """Test orgs come back in completion order over one session."""
+        sessions = []
+
+        class Client(GithubOrgClient):
+            """Client answering from its org name, without requests."""
+            def public_repos(self, license=None):
+                """Record the session, then fail, stall or answer."""
+                sessions.append(self._options["session"])
+                if self._org_name == "bad":
+                    raise ValueError("boom")
+                if self._org_name == "slow":
+                    time.sleep(0.2)
+                return [self._org_name + "-" + str(license)]
+
+        results = list(Client.public_repos_many(
+            ["slow", "fast", "bad", "fast"], "mit", return_exceptions=True))
+        self.assertEqual([name for name, _ in results][-1], "slow")
+        self.assertEqual(dict(results)["fast"], ["fast-mit"])
+        self.assertIsInstance(dict(results)["bad"], ValueError)
+        self.assertEqual(len(sessions), 3)
+        self.assertEqual(len(set(map(id, sessions))), 1)
+
+        with self.assertRaises(ValueError):
+            list(Client.public_repos_many(["bad"]))
+
+    @patch('client.make_session')
+    def test_public_repos_many_page_workers(self, mock_make_session):
+        """Test page_workers reaches each client and sizes the pool."""
+        workers = []
+
+        class Client(GithubOrgClient):
+            """Client recording its page fan-out, without requests."""
+            def public_repos(self, license=None):
+                """Record the page workers, then answer."""
+                workers.append(self._max_workers)
+                return []
+
+        list(Client.public_repos_many(["a", "b"], max_workers=3,
+                                      page_workers=5))
+        self.assertEqual(workers, [5, 5])
+        mock_make_session.assert_called_once_with(pool_maxsize=15)
+        mock_make_session.return_value.close.assert_called_once_with()
+
     @parameterized.expand([
         ({"license": {"key": "my_license"}}, "my_license", True),
         ({"license": {"key": "other_license"}}, "my_license", False)
@@ -78,11 +264,14 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """ Run setup before test """
-        config = {"return_value.json.side_effect": [
-            cls.org_payload, cls.repos_payload, cls.org_payload,
-            cls.repos_payload,
+        config = {"side_effect": [
+            MagicMock(content=json.dumps(payload).encode())
+            for payload in [
+                cls.org_payload, cls.repos_payload, cls.org_payload,
+                cls.repos_payload, cls.org_payload, cls.repos_payload,
+            ]
         ]}
-        cls.get_patcher = patch('requests.get', **config)
+        cls.get_patcher = patch('requests.Session.get', **config)
         cls.mock = cls.get_patcher.start()
 
     def test_public_repo(self):
@@ -95,6 +284,17 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         self.assertEqual(class_test.public_repos("XLICENSE"), [])
         self.mock.assert_called()
 
+    def test_public_repos_with_fields(self):
+        """ Intergration test for public repo with a field projection """
+        class_test = GithubOrgClient('google', fields=[("forks",)])
+
+        self.assertEqual(class_test.public_repos(), self.expected_repos)
+        self.assertEqual(class_test.public_repos(
+            "apache-2.0"), self.apache2_repos)
+        self.assertEqual(
+            class_test.repos_payload.column(("forks",)),
+            [repo["forks"] for repo in self.repos_payload])
+
     def test_public_repos_with_license(self):
         """ Intergration test for public repo with license """
         class_test = GithubOrgClient('google')
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Unit tests for coalesce.Coalescer."""
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from coalesce import Coalescer
+from client import GithubOrgClient
+
+
+class TestCoalescer(unittest.TestCase):
+    """Test case for Coalescer with threads."""
+
+    def test_single_flight(self):
+        """Test concurrent callers share one in-flight fetch."""
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            """Block until released."""
+            calls.append(1)
+            release.wait(5)
+            return {"v": 1}
+
+        coalescer = Coalescer()
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(coalescer.get("k", fetch)))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_lru_and_ttl(self):
+        """Test results are evicted by size and expire by age."""
+        now = [0.0]
+        coalescer = Coalescer(maxsize=2, ttl=10, clock=lambda: now[0])
+        fetch = Mock(side_effect=range(100))
+        for key in ("a", "b", "a", "c", "a", "b"):
+            coalescer.get(key, fetch)
+        self.assertEqual(fetch.call_count, 4)
+
+        now[0] = 11.0
+        self.assertEqual(coalescer.get("a", fetch), 4)
+
+    def test_errors_are_shared_not_kept(self):
+        """Test a failure reaches the caller and is not cached."""
+        coalescer = Coalescer()
+        with self.assertRaises(ValueError):
+            coalescer.get("k", Mock(side_effect=ValueError))
+        self.assertEqual(coalescer.get("k", lambda: 1), 1)
+
+    def test_invalidate(self):
+        """Test invalidate forces the next caller to fetch."""
+        coalescer = Coalescer()
+        coalescer.get("k", lambda: 1)
+        coalescer.invalidate("k")
+        self.assertEqual(coalescer.get("k", lambda: 2), 2)
+
+        coalescer.get("org/a", lambda: 1)
+        coalescer.get(("org/b", None), lambda: 1)
+        coalescer.invalidate_where(lambda key: "org/a" in key)
+        self.assertEqual(coalescer.get("org/a", lambda: 3), 3)
+        self.assertEqual(coalescer.get(("org/b", None), lambda: 3), 1)
+
+    def test_max_age(self):
+        """Test callers only reuse results as recent as they ask for."""
+        now = [0.0]
+        coalescer = Coalescer(ttl=30, clock=lambda: now[0])
+        coalescer.get("k", lambda: 1)
+        now[0] = 5.0
+        self.assertEqual(coalescer.get("k", lambda: 2, max_age=10), 1)
+        self.assertEqual(coalescer.get("k", lambda: 3, max_age=5), 3)
+        self.assertEqual(coalescer.get("k", lambda: 4), 3)
+
+
+class TestCoalescerAsync(unittest.IsolatedAsyncioTestCase):
+    """Test case for Coalescer with asyncio tasks."""
+
+    async def test_single_flight(self):
+        """Test concurrent tasks and a thread share one fetch."""
+        coalescer = Coalescer()
+        calls = []
+
+        async def fetch():
+            """Yield to the loop before answering."""
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        tasks = [asyncio.ensure_future(coalescer.aget("k", fetch))
+                 for _ in range(5)]
+        await asyncio.sleep(0)
+        from_thread = await asyncio.to_thread(coalescer.get, "k", Mock())
+        self.assertEqual(await asyncio.gather(*tasks), [42] * 5)
+        self.assertEqual(from_thread, 42)
+        self.assertEqual(len(calls), 1)
+
+
+class TestCoalescedClients(unittest.TestCase):
+    """Test case for GithubOrgClient instances sharing a coalescer."""
+
+    def test_one_fetch_per_url(self):
+        """Test two clients of one org fetch each URL once."""
+        session = Mock()
+        session.get.side_effect = [
+            Mock(content=b'{"repos_url": "https://x.io/orgs/google/repos"}',
+                 links={}),
+            Mock(content=b'[{"name": "a"}]', links={}),
+        ]
+        coalescer = Coalescer()
+        clients = [GithubOrgClient("google", session=session,
+                                   coalescer=coalescer) for _ in range(2)]
+        for client in clients:
+            self.assertEqual(client.public_repos(), ["a"])
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_same_fields_share_fetches(self):
+        """Test clients projecting the same fields share their fetches."""
+        session = Mock()
+        session.get.side_effect = [
+            Mock(content=b'{"repos_url": "https://x.io/orgs/google/repos"}',
+                 links={}),
+            Mock(content=b'[{"name": "a", "size": 1}]', links={}),
+        ]
+        coalescer = Coalescer()
+        clients = [GithubOrgClient("google", session=session,
+                                   coalescer=coalescer, fields=fields)
+                   for fields in ([("name",)], [["name"], ("name",)])]
+        for client in clients:
+            self.assertEqual(client.public_repos(), ["a"])
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_client_refresh(self):
+        """Test ttl and invalidate refetch what a coalescer still keeps."""
+        session = Mock()
+        answers = {
+            GithubOrgClient.ORG_URL.format(org="google"): iter(
+                b'{"v": %d, "repos_url": "https://x.io/r"}' % i
+                for i in range(3)),
+            "https://x.io/r?per_page=100": iter(
+                [b'[{"name": "a"}]', b'[{"name": "b"}]']),
+        }
+        session.get.side_effect = lambda url, **kwargs: Mock(
+            content=next(answers[url]), links={})
+        coalescer = Coalescer()
+        client = GithubOrgClient("google", session=session, ttl=0.01,
+                                 coalescer=coalescer)
+        self.assertEqual(client.org["v"], 0)
+        time.sleep(0.05)
+        self.assertEqual(client.org["v"], 1)
+
+        client = GithubOrgClient("google", session=session,
+                                 coalescer=coalescer)
+        self.assertEqual(client.public_repos(), ["a"])
+        client.invalidate()
+        self.assertEqual(client.org["v"], 2)
+        self.assertEqual(client.public_repos(), ["b"])
+        self.assertEqual(session.get.call_count, 5)
+
+        other = GithubOrgClient("google", session=session,
+                                coalescer=coalescer)
+        self.assertEqual(other.public_repos(), ["b"])
+        self.assertEqual(session.get.call_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
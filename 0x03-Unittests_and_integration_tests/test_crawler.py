@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Unit tests for the crawler command-line entry point."""
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import crawler
+
+
+def fake_public_repos(org_name):
+    """A client stand-in returning one repo per org, failing for 'bad'."""
+    class Client:
+        """Minimal GithubOrgClient stand-in."""
+
+        def public_repos(self, license=None):
+            """Repos of the org."""
+            if org_name == "bad":
+                raise ValueError("boom")
+            return ["{}-repo".format(org_name)]
+    return Client()
+
+
+class FakeClient:
+    """Picklable GithubOrgClient stand-in for the worker processes."""
+
+    def __init__(self, org_name):
+        """Remember the org."""
+        self._org_name = org_name
+
+    def public_repos(self, license=None):
+        """Repos of the org, failing for 'bad' and stalling for 'slow'."""
+        if self._org_name == "bad":
+            raise ValueError("boom")
+        if self._org_name == "slow":
+            time.sleep(0.5)
+        return ["{}-{}".format(self._org_name, license)]
+
+
+@patch('crawler.GithubOrgClient', side_effect=fake_public_repos)
+class TestCrawler(unittest.TestCase):
+    """Test case for crawler.main."""
+
+    def setUp(self):
+        """Write an orgs file in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.orgs = self.path("orgs.txt")
+        with open(self.orgs, "w") as orgs_file:
+            orgs_file.write("# orgs\ngoogle\n\nabc\nbad\ngoogle\n")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def path(self, name):
+        """Path of ``name`` in the temporary directory."""
+        return os.path.join(self.tmp.name, name)
+
+    def lines(self, name):
+        """JSON Lines of ``name``."""
+        with open(self.path(name)) as results:
+            return [json.loads(line) for line in results]
+
+    def test_json_lines(self, mock_client):
+        """Test one line per unique org, with errors reported inline."""
+        crawler.main([self.orgs, "--processes", "1",
+                      "--output", self.path("out.jsonl")])
+        self.assertEqual(self.lines("out.jsonl"), [
+            {"org": "google", "repos": ["google-repo"]},
+            {"org": "abc", "repos": ["abc-repo"]},
+            {"org": "bad", "error": "ValueError: boom"},
+        ])
+
+    def test_resume(self, mock_client):
+        """Test checkpointed orgs are skipped and failed ones retried."""
+        with open(self.path("done.txt"), "w") as checkpoint:
+            checkpoint.write("google\n")
+        crawler.main([self.orgs, "--processes", "1",
+                      "--output", self.path("out.jsonl"),
+                      "--checkpoint", self.path("done.txt")])
+        self.assertEqual([line["org"] for line in self.lines("out.jsonl")],
+                         ["abc", "bad"])
+        self.assertEqual(crawler.read_checkpoint(self.path("done.txt")),
+                         {"google", "abc"})
+
+
+class TestCrawlPool(unittest.TestCase):
+    """Test case for crawl over a process pool."""
+
+    def test_pool(self):
+        """Test every org comes back from the worker processes."""
+        orgs = ["org{}".format(i) for i in range(6)]
+        with patch.object(crawler, 'crawl_org', _echo):
+            results = list(crawler.crawl(orgs, processes=2, chunksize=2))
+        self.assertEqual(sorted(r["org"] for r in results), orgs)
+
+    def test_pool_completion_order(self):
+        """Test workers report in completion order and checkpoint
+        successes only.
+        """
+        orgs = ["slow", "a", "bad", "b", "c"]
+        output, checkpoint = io.StringIO(), io.StringIO()
+        results = crawler.crawl(orgs, "mit", processes=2, chunksize=1,
+                                client=FakeClient)
+        self.assertEqual(
+            crawler.write_results(results, output, checkpoint), 5)
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(lines[-1], {"org": "slow", "repos": ["slow-mit"]})
+        self.assertIn({"org": "bad", "error": "ValueError: boom"}, lines)
+        self.assertEqual(sorted(line["org"] for line in lines), sorted(orgs))
+        self.assertEqual(sorted(checkpoint.getvalue().split()),
+                         ["a", "b", "c", "slow"])
+
+
+def _echo(org_name, license=None, client=None):
+    """Picklable stand-in for crawl_org."""
+    return {"org": org_name, "repos": []}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Unit tests for the decoders backends and schema decoding."""
+import json
+import unittest
+from unittest.mock import patch, Mock
+import decoders
+from decoders import BACKENDS, get_decoder, schema_decoder
+from utils import get_json, post_json
+
+
+class TestGetDecoder(unittest.TestCase):
+    """Test case for get_decoder."""
+
+    def test_backends_agree(self):
+        """Test every installed backend decodes bytes alike."""
+        body = json.dumps({"a": [1, 2.5, None, "é"]}).encode()
+        for name in BACKENDS:
+            self.assertEqual(get_decoder(name)(body),
+                             {"a": [1, 2.5, None, "é"]}, name)
+
+    def test_default_is_fastest_installed(self):
+        """Test the stdlib is only the default when nothing else is."""
+        self.assertIs(get_decoder(), next(iter(BACKENDS.values())))
+        self.assertEqual(list(BACKENDS)[-1], "json")
+
+    def test_unknown_backend(self):
+        """Test asking for a missing backend fails clearly."""
+        with self.assertRaises(ValueError):
+            get_decoder("nope")
+
+
+class TestSchemaDecoder(unittest.TestCase):
+    """Test case for schema_decoder."""
+
+    body = json.dumps([
+        {"name": "a", "size": 3, "license": {"key": "mit", "url": "u"}},
+        {"name": "b", "license": None},
+        {"name": "c"},
+        {"name": 4, "license": "mit"},
+        {"name": "d", "license": {"key": ["x"]}},
+    ]).encode()
+    fields = [("name",), ("license", "key")]
+    expected = [
+        {"name": "a", "license": {"key": "mit"}},
+        {"name": "b"},
+        {"name": "c"},
+        {"name": 4},
+        {"name": "d", "license": {"key": ["x"]}},
+    ]
+
+    def test_keeps_only_fields(self):
+        """Test items keep the named fields only, whatever their types."""
+        self.assertEqual(schema_decoder(self.fields)(self.body),
+                         self.expected)
+
+    def test_without_msgspec(self):
+        """Test the fallback projects fully decoded items."""
+        with patch.object(decoders, "msgspec", None):
+            decode = schema_decoder(self.fields)
+            self.assertEqual(decode(self.body), self.expected)
+            self.assertEqual(decode(b'[1, {"name": "a"}]'),
+                             [{}, {"name": "a"}])
+
+    @unittest.skipIf(decoders.msgspec is None, "msgspec is not installed")
+    def test_backends_agree(self):
+        """Test msgspec and the fallback decode any list alike."""
+        with patch.object(decoders, "msgspec", None):
+            fallback = schema_decoder(self.fields)
+        decode = schema_decoder(self.fields)
+        self.assertIsNot(decode, fallback)
+        for body in (self.body, b'[1, {"name": "a"}]', b'[]'):
+            self.assertEqual(decode(body), fallback(body), body)
+
+    def test_cached_by_fields(self):
+        """Test equal fields, however spelled, share one decoder."""
+        self.assertIs(schema_decoder([["name"], ("name",)]),
+                      schema_decoder([("name",)]))
+        self.assertIsNot(schema_decoder([("name",)]),
+                         schema_decoder([("size",)]))
+
+
+class TestDecoderOption(unittest.TestCase):
+    """Test case for the decoder option of get_json and post_json."""
+
+    def test_get_json_decodes_raw_bytes(self):
+        """Test the response bytes go straight to the decoder."""
+        session = Mock()
+        session.get.return_value = Mock(content=b'{"a": 1}', links={})
+        decoder = Mock(return_value={"decoded": True})
+
+        self.assertEqual(get_json("https://x.io", session=session,
+                                  decoder=decoder), {"decoded": True})
+        decoder.assert_called_once_with(b'{"a": 1}')
+        session.get.return_value.json.assert_not_called()
+
+    def test_post_json(self):
+        """Test answers to POSTs are decoded the same way."""
+        session = Mock()
+        session.post.return_value = Mock(content=b'{"data": 1}')
+        self.assertEqual(post_json("https://x.io", {}, session=session),
+                         {"data": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
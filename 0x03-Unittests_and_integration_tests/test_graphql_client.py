@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Integration tests for GithubGraphQLClient against a local stub."""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from fixtures import TEST_PAYLOAD
+from graphql_client import GithubGraphQLClient, GraphQLError
+
+ORG_PAYLOAD, REPOS_PAYLOAD, EXPECTED_REPOS, APACHE2_REPOS = TEST_PAYLOAD[0]
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    """Answer aliased ``organization`` queries from ``server.orgs``."""
+
+    def do_POST(self):
+        """Answer one batched query, paging repos by integer cursor."""
+        request = json.loads(self.rfile.read(
+            int(self.headers["Content-Length"])))
+        self.server.queries.append(request)
+        self.server.auth.append(self.headers.get("Authorization"))
+        variables, data, errors = request["variables"], {}, []
+        i = 0
+        while "l{}".format(i) in variables:
+            login = variables["l{}".format(i)]
+            start = int(variables["c{}".format(i)] or 0)
+            repos = self.server.orgs.get(login)
+            if repos is None:
+                errors.append({"message": "Could not resolve " + login,
+                               "path": ["o{}".format(i)]})
+                data["o{}".format(i)] = None
+            else:
+                end = start + GithubGraphQLClient.PAGE_SIZE
+                data["o{}".format(i)] = {
+                    "login": login, "name": login.title(),
+                    "description": None, "url": "https://github.com/x",
+                    "repositories": {
+                        "totalCount": len(repos),
+                        "pageInfo": {"hasNextPage": end < len(repos),
+                                     "endCursor": str(end)},
+                        "nodes": [
+                            {"name": repo["name"],
+                             "licenseInfo": repo.get("license") and {
+                                 "key": repo["license"]["key"]}}
+                            for repo in repos[start:end]
+                        ],
+                    },
+                }
+            i += 1
+        answer = {"data": data}
+        if errors:
+            answer["errors"] = errors
+        body = json.dumps(answer).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+
+class TestGithubGraphQLClient(unittest.TestCase):
+    """Test case for GithubGraphQLClient."""
+
+    def setUp(self):
+        """Start the stub endpoint and point the client at it."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GraphQLHandler)
+        self.server.queries, self.server.auth = [], []
+        self.server.orgs = {
+            "google": REPOS_PAYLOAD,
+            "big": [{"name": "r{}".format(i)} for i in range(250)],
+        }
+        self.server.orgs.update(
+            ("org{}".format(i), REPOS_PAYLOAD) for i in range(12))
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        url = "http://{}:{}/graphql".format(*self.server.server_address)
+        patcher = patch.object(GithubGraphQLClient, "GRAPHQL_URL", url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Stop the stub endpoint."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_public_repos(self):
+        """Test one query serves org, repos and license filters."""
+        client = GithubGraphQLClient("google", token="t0k")
+
+        self.assertEqual(client.org["login"], "google")
+        self.assertEqual(client.public_repos(), EXPECTED_REPOS)
+        self.assertEqual(client.public_repos("apache-2.0"), APACHE2_REPOS)
+        self.assertEqual(len(self.server.queries), 1)
+        self.assertEqual(self.server.auth, ["bearer t0k"])
+
+    def test_cursor_paging(self):
+        """Test repos beyond one page are followed by cursor."""
+        client = GithubGraphQLClient("big")
+        self.assertEqual(len(client.repos_payload), 250)
+        self.assertEqual(client.org["public_repos"], 250)
+        self.assertEqual(len(self.server.queries), 3)
+
+    def test_fetch_many_batches(self):
+        """Test many orgs are fetched a batch at a time."""
+        orgs = ["org{}".format(i) for i in range(12)]
+        result = GithubGraphQLClient.fetch_many(orgs, license="apache-2.0")
+
+        self.assertEqual(list(result), orgs)
+        self.assertTrue(all(r == APACHE2_REPOS for r in result.values()))
+        self.assertEqual(len(self.server.queries), 2)
+
+    def test_errors(self):
+        """Test GraphQL errors are raised."""
+        with self.assertRaises(GraphQLError):
+            GithubGraphQLClient("missing").org
+
+    def test_partial_errors(self):
+        """Test orgs that failed do not lose the others of the scan."""
+        orgs = ["org{}".format(i) for i in range(12)]
+        orgs[3] = orgs[11] = "missing"
+        result = GithubGraphQLClient.fetch_many(
+            [*orgs, "gone"], license="apache-2.0", return_exceptions=True)
+
+        self.assertIsInstance(result.pop("missing"), GraphQLError)
+        self.assertIn("Could not resolve gone", str(result.pop("gone")))
+        self.assertEqual(list(result), [o for o in orgs if o != "missing"])
+        self.assertTrue(all(r == APACHE2_REPOS for r in result.values()))
+
+        with self.assertRaises(GraphQLError) as raised:
+            GithubGraphQLClient.fetch_many(["google", "missing"])
+        self.assertEqual(list(raised.exception.errors), ["missing"])
+        self.assertEqual(raised.exception.results,
+                         {"google": EXPECTED_REPOS})
+
+    def test_answer_without_data(self):
+        """Test errors outside any org fail every org of the batch."""
+        answer = {"data": None, "errors": [{"message": "rate limited"}]}
+        with patch("graphql_client.post_json", return_value=answer):
+            result = GithubGraphQLClient.fetch_orgs(
+                ["a", "b"], return_exceptions=True)
+        self.assertEqual(list(result), ["a", "b"])
+        self.assertEqual(str(result["b"]), "b: rate limited")
+
+    def test_rest_options(self):
+        """Test REST-only options are refused and repos_url is derived."""
+        with self.assertRaises(TypeError):
+            GithubGraphQLClient("google", cache=object())
+        client = GithubGraphQLClient("google")
+        self.assertEqual(client._public_repos_url,
+                         "https://api.github.com/orgs/google/repos")
+        self.assertEqual(self.server.queries, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
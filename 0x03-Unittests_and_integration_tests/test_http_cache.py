@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Unit tests for http_cache.SQLiteCache."""
+import os
+import tempfile
+import unittest
+from http_cache import CacheEntry, SQLiteCache
+
+
+class TestSQLiteCache(unittest.TestCase):
+    """Test case for SQLiteCache."""
+
+    def setUp(self):
+        """Create a cache file in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test a stored entry is returned unchanged."""
+        cache = SQLiteCache(self.path)
+        entry = CacheEntry(b'{"a": 1}', '"etag"', "Mon, 01 Jan 2024", "<x>")
+        cache.set("u", entry)
+        self.assertEqual(cache.get("u"), entry)
+        self.assertIsNone(cache.get("missing"))
+        cache.close()
+
+    def test_survives_restart(self):
+        """Test entries are persisted across instances."""
+        cache = SQLiteCache(self.path)
+        cache.set("u", CacheEntry(b"[]", '"v1"'))
+        cache.close()
+
+        cache = SQLiteCache(self.path)
+        self.assertEqual(cache.get("u").etag, '"v1"')
+        cache.close()
+
+    def test_lru_eviction(self):
+        """Test the least recently used entries are evicted first."""
+        cache = SQLiteCache(self.path, max_bytes=30)
+        cache.set("a", CacheEntry(b"x" * 10))
+        cache.set("b", CacheEntry(b"x" * 10))
+        cache.set("c", CacheEntry(b"x" * 10))
+        cache.get("a")
+        cache.set("d", CacheEntry(b"x" * 10))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 3)
+        cache.close()
+
+    def test_clear(self):
+        """Test clear removes every entry."""
+        cache = SQLiteCache(self.path)
+        cache.set("a", CacheEntry(b"[]"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Unit tests for instrument hooks and HistogramAggregator."""
+import unittest
+from unittest.mock import patch, Mock
+import benchmark
+from client import GithubOrgClient
+from instrument import HistogramAggregator, add_hook, emit, remove_hook
+from ratelimit import RateLimitScheduler
+from resilience import CircuitBreaker, RetryPolicy
+from utils import get_json, make_session, memoize
+
+
+class TestHistogramAggregator(unittest.TestCase):
+    """Test case for HistogramAggregator."""
+
+    def test_summary(self):
+        """Test counts, sums and bounded percentile estimates."""
+        histograms = HistogramAggregator()
+        for value in range(1, 101):
+            histograms("bytes", value, {})
+        stats = histograms.summary()["bytes"]
+
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual(stats["sum"], 5050)
+        self.assertEqual((stats["min"], stats["max"]), (1, 100))
+        self.assertTrue(50 <= stats["p50"] <= 100)
+        self.assertTrue(99 <= stats["p99"] <= 100)
+
+    def test_by_tags(self):
+        """Test series are split by the tracked tags only."""
+        histograms = HistogramAggregator(by_tags=("host",))
+        histograms("ttfb", 0.1, {"host": "a", "other": "x"})
+        histograms("ttfb", 0.2, {"host": "b"})
+        histograms("ttfb", 0.3, {})
+        self.assertEqual(list(histograms.summary()),
+                         ["ttfb", "ttfb{host=a}", "ttfb{host=b}"])
+        self.assertIn("ttfb{host=a}", histograms.dump())
+
+
+class TestHooks(unittest.TestCase):
+    """Test case for the metrics emitted by utils and client."""
+
+    def setUp(self):
+        """Register a fresh aggregator."""
+        self.histograms = add_hook(HistogramAggregator())
+
+    def tearDown(self):
+        """Unregister the aggregator."""
+        remove_hook(self.histograms)
+
+    def test_no_hooks(self):
+        """Test emitting without hooks is a no-op."""
+        remove_hook(self.histograms)
+        emit("decode", 1.0)
+        self.histograms = add_hook(HistogramAggregator())
+        self.assertEqual(self.histograms.summary(), {})
+
+    def test_http_phases(self):
+        """Test a real request reports every phase once per call."""
+        with benchmark.serve() as server:
+            session = make_session()
+            options = {"session": session, "scheduler": RateLimitScheduler(),
+                       "breaker": CircuitBreaker()}
+            url = server.base_url + "/orgs/synthetic-3"
+            get_json(url, **options)
+            get_json(url, **options)
+            session.close()
+        stats = self.histograms.summary()
+
+        self.assertEqual(stats["connect"]["count"], 1)
+        for metric in ("ttfb", "download", "decode", "bytes"):
+            self.assertEqual(stats[metric]["count"], 2, metric)
+        self.assertGreater(stats["bytes"]["min"], 0)
+
+    @patch('utils.time.sleep')
+    def test_retries(self, mock_sleep):
+        """Test each retry is counted."""
+        session = Mock()
+        session.get.side_effect = [
+            Mock(status_code=503, headers={}),
+            Mock(status_code=200, headers={}, content=b"{}"),
+        ]
+        get_json("https://x.io", session=session, retry=RetryPolicy(),
+                 breaker=CircuitBreaker())
+        self.assertEqual(self.histograms.summary()["retry"]["count"], 1)
+
+    def test_memoize(self):
+        """Test memoized reads report hits and misses."""
+        class Thing:
+            """Object with one memoized property."""
+            @memoize
+            def value(self):
+                """Value computed on first read."""
+                return 1
+
+        thing = Thing()
+        thing.value
+        thing.value
+        thing.value
+        stats = self.histograms.summary()
+        self.assertEqual(stats["memoize.miss"]["count"], 1)
+        self.assertEqual(stats["memoize.hit"]["count"], 2)
+
+    @patch('client.get_json_pages', return_value=[{"name": "a"}])
+    @patch('client.get_json', return_value={"repos_url": "url"})
+    def test_client(self, mock_get_json, mock_get_json_pages):
+        """Test the client's memoized payloads and filter are reported."""
+        client = GithubOrgClient("google")
+        client.public_repos()
+        client.public_repos()
+        stats = self.histograms.summary()
+        self.assertEqual(stats["filter"]["count"], 2)
+        self.assertEqual(stats["memoize.miss"]["count"], 2)
+        self.assertGreaterEqual(stats["memoize.hit"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
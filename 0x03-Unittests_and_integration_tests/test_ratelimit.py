@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Unit tests for ratelimit.RateLimitScheduler."""
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from parameterized import parameterized
+from ratelimit import PRIORITY_ORG, PRIORITY_PAGES, RateLimitScheduler
+from utils import get_json
+
+
+def response(status=200, **headers):
+    """A fake response carrying rate-limit headers."""
+    return Mock(status_code=status, headers={
+        key.replace("_", "-"): str(value) for key, value in headers.items()
+    })
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+    """Test case for RateLimitScheduler."""
+
+    @parameterized.expand([
+        (response(200, X_RateLimit_Remaining=10), False),
+        (response(403, X_RateLimit_Remaining=0), True),
+        (response(429, Retry_After=0), True),
+        (response(403), False),
+    ])
+    def test_update_flags_rejections(self, resp, limited):
+        """Test only rate-limit rejections ask for a retry."""
+        self.assertEqual(RateLimitScheduler().update(resp), limited)
+
+    def test_waits_for_reset(self):
+        """Test an exhausted budget blocks until the reset time."""
+        scheduler = RateLimitScheduler()
+        scheduler.update(response(200, X_RateLimit_Remaining=1,
+                                  X_RateLimit_Reset=time.time() + 0.3))
+        start = time.monotonic()
+        scheduler.acquire()
+        self.assertLess(time.monotonic() - start, 0.1)
+        scheduler.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_retry_after_pauses(self):
+        """Test Retry-After pauses every caller."""
+        scheduler = RateLimitScheduler()
+        scheduler.update(response(429, Retry_After=0.2))
+        start = time.monotonic()
+        scheduler.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_past_reset_pauses(self):
+        """Test a rejection whose reset already passed still waits."""
+        scheduler = RateLimitScheduler()
+        scheduler.MIN_PAUSE = 0.2
+        self.assertTrue(scheduler.update(response(
+            403, X_RateLimit_Remaining=0, X_RateLimit_Reset=time.time() - 5)))
+        start = time.monotonic()
+        scheduler.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_token_bucket(self):
+        """Test max_rate paces calls once the burst is spent."""
+        scheduler = RateLimitScheduler(max_rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            scheduler.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_priority(self):
+        """Test org fetches are let through before queued pages."""
+        scheduler = RateLimitScheduler()
+        scheduler.update(response(429, Retry_After=0.2))
+        order = []
+
+        def worker(priority, name):
+            """Record when this caller is let through."""
+            scheduler.acquire(priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=worker,
+                                    args=(PRIORITY_PAGES, "page"))
+                   for _ in range(3)]
+        threads.append(threading.Thread(target=worker,
+                                        args=(PRIORITY_ORG, "org")))
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ["org", "page", "page", "page"])
+
+
+class TestGetJsonRateLimited(unittest.TestCase):
+    """Test case for get_json behind a scheduler."""
+
+    def test_retries_after_rejection(self):
+        """Test a rejected request is sent again instead of failing."""
+        ok = response(200, X_RateLimit_Remaining=99)
+        ok.content = b'{"login": "google"}'
+        session = Mock()
+        session.get.side_effect = [response(429, Retry_After=0.05), ok]
+
+        result = get_json("https://x.io", session=session,
+                          scheduler=RateLimitScheduler())
+        self.assertEqual(result, {"login": "google"})
+        self.assertEqual(session.get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
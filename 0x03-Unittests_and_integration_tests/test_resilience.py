@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Unit tests for resilience.RetryPolicy and resilience.CircuitBreaker."""
+import json
+import unittest
+from unittest.mock import patch, Mock
+import requests
+from resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    get_breaker,
+)
+from coalesce import Coalescer
+from utils import get_json, get_json_pages
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test case for RetryPolicy."""
+
+    def test_delays(self):
+        """Test delays are bounded in count and size."""
+        policy = RetryPolicy(retries=50, base=0.5, cap=4.0)
+        delays = list(policy.delays())
+        self.assertEqual(len(delays), 50)
+        self.assertTrue(all(0.5 <= delay <= 4.0 for delay in delays))
+        self.assertEqual(max(delays), 4.0)
+
+    def test_should_retry(self):
+        """Test only configured statuses are retried."""
+        policy = RetryPolicy()
+        self.assertTrue(policy.should_retry(Mock(status_code=503)))
+        self.assertFalse(policy.should_retry(Mock(status_code=404)))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test case for CircuitBreaker."""
+
+    def test_transitions(self):
+        """Test the breaker opens, probes and closes again."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10,
+                                 clock=lambda: now[0])
+        breaker.before()
+        breaker.failure()
+        breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before()
+
+        now[0] = 10.0
+        breaker.before()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before()
+        breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        now[0] = 20.0
+        breaker.before()
+        breaker.success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_get_breaker_per_host(self):
+        """Test breakers are shared per host."""
+        self.assertIs(get_breaker("https://a.io/x"),
+                      get_breaker("https://a.io/y?z=1"))
+        self.assertIsNot(get_breaker("https://a.io/x"),
+                         get_breaker("https://b.io/x"))
+
+
+def response(status, payload=None):
+    """A fake response."""
+    return Mock(status_code=status, headers={},
+                content=json.dumps(payload).encode())
+
+
+def real_response(status, payload, url, link=None):
+    """A ``requests.Response`` with a JSON body and optional Link header."""
+    answer = requests.Response()
+    answer.status_code, answer.url = status, url
+    answer._content = json.dumps(payload).encode()
+    answer._content_consumed = True
+    if link is not None:
+        answer.headers["Link"] = link
+    return answer
+
+
+@patch('utils.time.sleep')
+class TestGetJsonRetries(unittest.TestCase):
+    """Test case for get_json retries, timeouts and circuit breaking."""
+
+    def test_retries_transient_status(self, mock_sleep):
+        """Test 5xx answers are retried until one succeeds."""
+        session = Mock()
+        session.get.side_effect = [response(502), response(503),
+                                   response(200, {"ok": True})]
+        result = get_json("https://x.io", session=session, timeout=(1, 2),
+                          breaker=CircuitBreaker())
+
+        self.assertEqual(result, {"ok": True})
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        session.get.assert_called_with("https://x.io", timeout=(1, 2))
+
+    def test_gives_up_after_retries(self, mock_sleep):
+        """Test the last connection error is raised once retries run out."""
+        session = Mock()
+        session.get.side_effect = requests.exceptions.ConnectTimeout()
+        with self.assertRaises(requests.exceptions.ConnectTimeout):
+            get_json("https://x.io", session=session,
+                     retry=RetryPolicy(retries=2),
+                     breaker=CircuitBreaker())
+        self.assertEqual(session.get.call_count, 3)
+
+    def test_failed_page_raises(self, mock_sleep):
+        """Test a page still failing after retries fails the listing."""
+        link = '<https://x.io/r?page=2>; rel="next", ' \
+            '<https://x.io/r?page=3>; rel="last"'
+        error = {"message": "boom", "documentation_url": "d"}
+        pages = {
+            "https://x.io/r": real_response(200, [{"name": "a"}],
+                                            "https://x.io/r", link),
+            "https://x.io/r?page=2": real_response(200, [{"name": "b"}],
+                                                   "https://x.io/r?page=2"),
+        }
+        session = Mock()
+        session.get.side_effect = lambda url, **kwargs: pages.get(url) or \
+            real_response(500, error, url)
+        coalescer = Coalescer()
+
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                get_json_pages("https://x.io/r", session=session,
+                               retry=RetryPolicy(retries=1),
+                               breaker=CircuitBreaker(), coalescer=coalescer)
+        failed = [call for call in session.get.call_args_list
+                  if call[0][0] == "https://x.io/r?page=3"]
+        self.assertEqual(len(failed), 2 * 2)
+
+    def test_page_not_a_list(self, mock_sleep):
+        """Test a page that is not a list is rejected, not concatenated."""
+        session = Mock()
+        session.get.return_value = real_response(
+            200, {"message": "odd"}, "https://x.io/r")
+        with self.assertRaises(ValueError):
+            get_json_pages("https://x.io/r", session=session,
+                           breaker=CircuitBreaker())
+
+    def test_open_circuit_fails_fast(self, mock_sleep):
+        """Test an unhealthy host is not called while its circuit is open."""
+        session = Mock()
+        session.get.side_effect = requests.exceptions.ConnectionError()
+        breaker = CircuitBreaker(failure_threshold=2)
+        with self.assertRaises(CircuitOpenError):
+            get_json("https://x.io", session=session,
+                     retry=RetryPolicy(retries=5), breaker=breaker)
+        self.assertEqual(session.get.call_count, 2)
+
+        with self.assertRaises(CircuitOpenError):
+            get_json("https://x.io", session=session, breaker=breaker)
+        self.assertEqual(session.get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Unit tests for snapshot.SnapshotStore."""
+import os
+import tempfile
+import unittest
+from snapshot import SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """Test case for SnapshotStore."""
+
+    def setUp(self):
+        """Create a store file in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "snapshot.sqlite")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_upsert_keeps_order(self):
+        """Test replaced repos keep their place and new ones go last."""
+        store = SnapshotStore(self.path)
+        store.upsert("org", [{"name": "a", "updated_at": "1"},
+                             {"name": "b", "updated_at": "2"}])
+        store.upsert("org", [{"name": "c", "updated_at": "4"},
+                             {"name": "a", "updated_at": "3", "x": 1}])
+
+        self.assertEqual(store.names("org"), ["a", "b", "c"])
+        self.assertEqual(store.repos("org")[0],
+                         {"name": "a", "updated_at": "3", "x": 1})
+        self.assertEqual(store.watermark("org"), "4")
+        store.close()
+
+    def test_orgs_are_separate(self):
+        """Test each org has its own repos and watermark."""
+        store = SnapshotStore(self.path)
+        store.upsert("one", [{"name": "a", "updated_at": "1"}])
+        store.replace("two", [{"name": "a", "updated_at": "2"}])
+        self.assertEqual(store.watermark("one"), "1")
+        self.assertIsNone(store.watermark("three"))
+
+        store.clear("one")
+        self.assertEqual(store.repos("one"), [])
+        self.assertEqual(store.names("two"), ["a"])
+        store.close()
+
+    def test_watermark_of_stored_org(self):
+        """Test orgs stored without timestamps still have a watermark."""
+        store = SnapshotStore(self.path)
+        store.replace("empty", [])
+        store.upsert("untimed", [{"name": "a"}])
+        self.assertEqual(store.watermark("empty"), "")
+        self.assertEqual(store.watermark("untimed"), "")
+
+        store.upsert("untimed", [{"name": "b", "updated_at": "2"}])
+        store.upsert("untimed", [{"name": "c", "updated_at": "1"}])
+        self.assertEqual(store.watermark("untimed"), "2")
+        store.clear("empty")
+        self.assertIsNone(store.watermark("empty"))
+        store.close()
+
+    def test_failed_replace_keeps_snapshot(self):
+        """Test a replace failing midway leaves the old snapshot intact."""
+        store = SnapshotStore(self.path)
+        store.replace("org", [{"name": "a", "updated_at": "1"}])
+
+        def repos():
+            """Yield one repo, then fail."""
+            yield {"name": "b", "updated_at": "2"}
+            raise ValueError("listing failed")
+
+        with self.assertRaises(ValueError):
+            store.replace("org", repos())
+        self.assertEqual(store.names("org"), ["a"])
+        self.assertEqual(store.watermark("org"), "1")
+        store.close()
+
+    def test_survives_restart(self):
+        """Test the snapshot is persisted across instances."""
+        store = SnapshotStore(self.path)
+        store.upsert("org", [{"name": "a", "pushed_at": "p"}])
+        store.close()
+
+        store = SnapshotStore(self.path)
+        self.assertEqual(store.repos("org"), [{"name": "a", "pushed_at": "p"}])
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
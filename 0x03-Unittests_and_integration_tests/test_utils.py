@@ -2,11 +2,109 @@
 """
 Unit tests for utils.access_nested_map.
 """
+import json
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock
+from collections.abc import Mapping
+from urllib.parse import parse_qsl, urlsplit
 from parameterized import parameterized
 from utils import access_nested_map
-from utils import get_json, memoize
+from utils import get_json, get_json_pages, with_query, memoize
+from utils import configure_session, get_session, make_session
+from utils import ttl_memoize
+from utils import iter_json_array, iter_json_pages, project
+from utils import ColumnarRecords, DEFAULT_TIMEOUT
+from utils import compile_path, extract_path, extract_columns
+import utils
+from fixtures import TEST_PAYLOAD
+from http_cache import SQLiteCache
+
+
+class PagedHandler(BaseHTTPRequestHandler):
+    """Serve ``server.items`` as a ``Link``-paginated JSON list."""
+
+    def do_GET(self):
+        """Answer one page of the listing."""
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        items = self.server.items
+        last = max(1, -(-len(items) // per_page))
+        self.server.requested.append(page)
+
+        base = "http://{}:{}{}".format(*self.server.server_address,
+                                       parts.path)
+        links = []
+        if page < last:
+            links.append('<{}>; rel="next"'.format(
+                with_query(base, per_page=per_page, page=page + 1)))
+            if self.server.advertise_last:
+                links.append('<{}>; rel="last"'.format(
+                    with_query(base, per_page=per_page, page=last)))
+
+        body = json.dumps(
+            items[(page - 1) * per_page:page * per_page]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if links:
+            self.send_header("Link", ", ".join(links))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+
+class TestGetJsonPages(unittest.TestCase):
+    """Test case for get_json_pages against a local stub server."""
+
+    def setUp(self):
+        """Start a stub server on an ephemeral port."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), PagedHandler)
+        self.server.items = [{"name": str(i)} for i in range(250)]
+        self.server.requested = []
+        self.server.advertise_last = True
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = "http://{}:{}/orgs/x/repos".format(
+            *self.server.server_address)
+
+    def tearDown(self):
+        """Stop the stub server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetches_every_page(self):
+        """Test pages are fetched once each and kept in order."""
+        result = get_json_pages(self.url, per_page=20, max_workers=4)
+        self.assertEqual(result, self.server.items)
+        self.assertEqual(sorted(self.server.requested), list(range(1, 14)))
+
+    def test_follows_next_without_last(self):
+        """Test serial fallback when only ``next`` links are sent."""
+        self.server.advertise_last = False
+        result = get_json_pages(self.url, per_page=100)
+        self.assertEqual(result, self.server.items)
+        self.assertEqual(self.server.requested, [1, 2, 3])
+
+    def test_iter_json_pages(self):
+        """Test streamed pages yield every item, projected on request."""
+        self.server.advertise_last = False
+        result = list(iter_json_pages(self.url, per_page=100,
+                                      fields=[("name",)]))
+        self.assertEqual(result, self.server.items)
+        self.assertEqual(self.server.requested, [1, 2, 3])
+
+    def test_single_page(self):
+        """Test a listing that fits on one page needs one request."""
+        result = get_json_pages(self.url, per_page=300)
+        self.assertEqual(result, self.server.items)
+        self.assertEqual(self.server.requested, [1])
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -32,6 +130,65 @@ class TestAccessNestedMap(unittest.TestCase):
         self.assertEqual(str(context.exception), repr(path[-1]))
 
 
+class TestCompilePath(unittest.TestCase):
+    """Test case for compile_path and extract_path."""
+
+    class Frozen(Mapping):
+        """A Mapping that is not a dict."""
+
+        def __init__(self, data):
+            """Wrap ``data``."""
+            self.data = data
+
+        def __getitem__(self, key):
+            """Item of the wrapped dict."""
+            return self.data[key]
+
+        def __iter__(self):
+            """Keys of the wrapped dict."""
+            return iter(self.data)
+
+        def __len__(self):
+            """Size of the wrapped dict."""
+            return len(self.data)
+
+    @parameterized.expand([
+        ({"a": 1}, ("a",)),
+        ({"a": {"b": 2}}, ("a",)),
+        ({"a": {"b": 2}}, ("a", "b")),
+        ({"a": {"b": {"c": 3}}}, ("a", "b", "c")),
+        ({"a": {"b": {"c": 3}}}, ()),
+    ])
+    def test_matches_access_nested_map(self, nested_map, path):
+        """Test compiled getters return what access_nested_map does."""
+        self.assertEqual(compile_path(path)(nested_map),
+                         access_nested_map(nested_map, path))
+        self.assertEqual(compile_path(path)(self.Frozen(nested_map)),
+                         access_nested_map(self.Frozen(nested_map), path))
+
+    @parameterized.expand([
+        ({}, ("a",)),
+        ({"a": 1}, ("a", "b")),
+        ({"a": {"b": 1}}, ("a", "b", "c")),
+        ({"a": {"b": {}}}, ("a", "b", "c")),
+    ])
+    def test_same_key_error(self, nested_map, path):
+        """Test compiled getters raise the same KeyError."""
+        with self.assertRaises(KeyError) as expected:
+            access_nested_map(nested_map, path)
+        with self.assertRaises(KeyError) as context:
+            compile_path(path)(nested_map)
+        self.assertEqual(str(context.exception), str(expected.exception))
+
+    def test_extract_path(self):
+        """Test bulk extraction raises, or fills in the default."""
+        repos = [{"license": {"key": "mit"}}, {"license": None}, {}]
+        self.assertEqual(extract_path(repos, ("license", "key"), None),
+                         ["mit", None, None])
+        with self.assertRaises(KeyError):
+            extract_path(repos, ("license", "key"))
+
+
 class TestGetJson(unittest.TestCase):
     """Test case for get_json function."""
 
@@ -41,14 +198,251 @@ class TestGetJson(unittest.TestCase):
     ])
     def test_get_json(self, test_url, test_payload):
         """Test get_json returns expected result."""
-        with patch('utils.requests.get') as mocked_get:
-            mocked_get.return_value = Mock(json=lambda: test_payload)
+        with patch('utils.get_session') as mocked_session:
+            mocked_get = mocked_session.return_value.get
+            mocked_get.return_value = Mock(
+                content=json.dumps(test_payload).encode())
 
             result = get_json(test_url)
-            mocked_get.assert_called_once_with(test_url)
+            mocked_get.assert_called_once_with(test_url,
+                                               timeout=DEFAULT_TIMEOUT)
             self.assertEqual(result, test_payload)
 
 
+class TestIterJsonArray(unittest.TestCase):
+    """Test case for iter_json_array."""
+
+    @parameterized.expand([
+        ("objects", [{"a": 1}, {"b": [1, 2, {"c": None}]}]),
+        ("numbers", [1, 23, 456.5, -7, 8e10]),
+        ("strings", ["caf\u00e9", "\u2603 ]", "a,b"]),
+        ("empty", []),
+    ])
+    def test_any_chunking(self, name, items):
+        """Test the items survive being split into chunks of any size."""
+        data = json.dumps(items, ensure_ascii=False).encode()
+        for size in (1, 2, 7, len(data) or 1):
+            chunks = [data[i:i + size] for i in range(0, len(data), size)]
+            self.assertEqual(list(iter_json_array(chunks)), items)
+
+    def test_lazy(self):
+        """Test items are yielded before later chunks are read."""
+        def chunks():
+            """First item, then fail if read further."""
+            yield b'[{"a": 1}, '
+            raise AssertionError("read too far")
+
+        self.assertEqual(next(iter_json_array(chunks())), {"a": 1})
+
+    @parameterized.expand([
+        ('{"a": 1}',),
+        ('[{"a": 1}, {"a"',),
+        ('[1, 2',),
+        ('[1 2]',),
+        ('[{"a": 1} {"a": 2}]',),
+        ('[1,]',),
+        ('[, 1]',),
+        ('[1] 2',),
+        ('[1]]',),
+    ])
+    def test_invalid(self, text):
+        """Test malformed, truncated and non-arrays raise ValueError."""
+        for chunks in ([text.encode()], [c.encode() for c in text]):
+            with self.assertRaises(ValueError):
+                list(iter_json_array(chunks))
+
+
+class TestProject(unittest.TestCase):
+    """Test case for project."""
+
+    def test_project(self):
+        """Test only the requested, existing paths are kept."""
+        repo = {"name": "x", "license": None, "owner": {"id": 1, "x": 2}}
+        self.assertEqual(
+            project(repo, [("name",), ("license", "key"), ("owner", "id")]),
+            {"name": "x", "owner": {"id": 1}})
+
+
+class TestColumnarRecords(unittest.TestCase):
+    """Test case for ColumnarRecords."""
+
+    paths = [("name",), ("license", "key"), ("owner", "login")]
+
+    def test_matches_project(self):
+        """Test records read back exactly like projected dicts."""
+        repos = TEST_PAYLOAD[0][1]
+        records = ColumnarRecords(repos, self.paths)
+
+        expected = [project(repo, self.paths) for repo in repos]
+        self.assertEqual(len(records), len(repos))
+        self.assertEqual(list(records), expected)
+        self.assertEqual(records[1], expected[1])
+        self.assertEqual(records[-2:], expected[-2:])
+
+    def test_column(self):
+        """Test a column fills missing values with the default."""
+        records = ColumnarRecords(
+            [{"license": {"key": "mit"}}, {"license": None}, {}],
+            [("license", "key")])
+        self.assertEqual(records.column(("license", "key"), "none"),
+                         ["mit", "none", "none"])
+
+    def test_compact(self):
+        """Test no per-record dicts are kept."""
+        records = ColumnarRecords(TEST_PAYLOAD[0][1], self.paths)
+        self.assertFalse(hasattr(records, "__dict__"))
+        self.assertTrue(all(isinstance(column, list)
+                            for column in records.columns))
+
+
+class TestExtractColumns(unittest.TestCase):
+    """Test case for extract_columns."""
+
+    repos = [
+        {"forks": 3, "stargazers_count": 1.5, "license": {"key": "mit"}},
+        {"forks": 5, "license": None},
+    ]
+    paths = [("forks",), ("stargazers_count",), ("license", "key")]
+
+    def test_without_numpy(self):
+        """Test numeric columns fall back to the array module."""
+        with patch.object(utils, "numpy", None):
+            columns = extract_columns(self.repos, self.paths, missing="-")
+        self.assertEqual(columns[("forks",)].typecode, "q")
+        self.assertEqual(list(columns[("forks",)]), [3, 5])
+        stars = columns[("stargazers_count",)]
+        self.assertEqual(stars.typecode, "d")
+        self.assertEqual(stars[0], 1.5)
+        self.assertNotEqual(stars[1], stars[1])
+        self.assertEqual(columns[("license", "key")], ["mit", "-"])
+
+    @unittest.skipIf(utils.numpy is None, "numpy is not installed")
+    def test_with_numpy(self):
+        """Test columns support vectorized masks."""
+        columns = extract_columns(self.repos, self.paths)
+        forks = columns[("forks",)]
+        self.assertEqual(str(forks.dtype), "int64")
+        mit = columns[("license", "key")] == "mit"
+        self.assertEqual(forks[mit].tolist(), [3])
+        self.assertEqual(
+            int(utils.numpy.isnan(columns[("stargazers_count",)]).sum()), 1)
+
+    def test_columnar_records(self):
+        """Test ColumnarRecords packs its columns the same way."""
+        records = ColumnarRecords(self.repos, self.paths)
+        with patch.object(utils, "numpy", None):
+            arrays = records.arrays()
+            expected = extract_columns(self.repos, self.paths)
+        self.assertEqual(arrays.keys(), expected.keys())
+        self.assertEqual(list(arrays[("forks",)]),
+                         list(expected[("forks",)]))
+        self.assertEqual(arrays[("license", "key")], ["mit", None])
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Serve ``server.body`` with an ETag and honour If-None-Match."""
+
+    def do_GET(self):
+        """Answer 304 when the client already holds the current body."""
+        etag = '"{}"'.format(hash(self.server.body))
+        self.server.conditional.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.server.body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+
+class TestConditionalGetJson(unittest.TestCase):
+    """Test case for get_json with a conditional-request cache."""
+
+    def setUp(self):
+        """Start a stub server and open an in-memory cache."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+        self.server.body = b'{"login": "google"}'
+        self.server.conditional = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = "http://{}:{}/orgs/google".format(
+            *self.server.server_address)
+        self.cache = SQLiteCache(":memory:")
+
+    def tearDown(self):
+        """Stop the stub server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.close()
+
+    def test_not_modified_reuses_body(self):
+        """Test a 304 answer returns the cached body."""
+        first = get_json(self.url, cache=self.cache)
+        second = get_json(self.url, cache=self.cache)
+
+        self.assertEqual(first, {"login": "google"})
+        self.assertEqual(second, first)
+        etag = self.cache.get(self.url).etag
+        self.assertEqual(self.server.conditional, [None, etag])
+
+    def test_modified_refreshes_entry(self):
+        """Test a changed body replaces the cached one."""
+        get_json(self.url, cache=self.cache)
+        self.server.body = b'{"login": "alphabet"}'
+
+        self.assertEqual(get_json(self.url, cache=self.cache),
+                         {"login": "alphabet"})
+        self.assertEqual(self.cache.get(self.url).body,
+                         b'{"login": "alphabet"}')
+
+
+class TestSession(unittest.TestCase):
+    """Test case for the pooled session helpers."""
+
+    def test_make_session(self):
+        """Test pool sizes and negotiated headers."""
+        session = make_session(pool_connections=3, pool_maxsize=7,
+                               pool_block=True)
+        adapter = session.get_adapter("https://api.github.com")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(session.headers["Accept-Encoding"], "gzip, deflate")
+        self.assertEqual(session.headers["Connection"], "keep-alive")
+
+    def test_get_session_is_shared(self):
+        """Test concurrent callers all get the same session."""
+        with patch('utils._session', None):
+            sessions = []
+            threads = [
+                threading.Thread(target=lambda: sessions.append(get_session()))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len({id(session) for session in sessions}), 1)
+
+    def test_configure_session(self):
+        """Test the shared session is replaced and the old one closed."""
+        with patch('utils._session', None):
+            old = get_session()
+            with patch.object(old, 'close') as mock_close:
+                new = configure_session(pool_maxsize=2)
+                mock_close.assert_called_once()
+            self.assertIsNot(old, new)
+            self.assertIs(get_session(), new)
+
+
 class TestMemoize(unittest.TestCase):
     """Test case for memoize decorator."""
 
@@ -78,5 +472,118 @@ class TestMemoize(unittest.TestCase):
             self.assertEqual(result2, 42)
 
 
+class TestTTLMemoize(unittest.TestCase):
+    """Test case for ttl_memoize decorator."""
+
+    class TestClass:
+        """Test class to use with ttl_memoize decorator."""
+
+        def __init__(self):
+            """Count calls of the memoized methods."""
+            self.calls = 0
+
+        @ttl_memoize(ttl=10)
+        def a_property(self):
+            """Property memoized for ten seconds."""
+            self.calls += 1
+            return self.calls
+
+        @ttl_memoize(maxsize=2)
+        def square(self, x):
+            """Method memoized per argument."""
+            self.calls += 1
+            return x * x
+
+    def test_property(self):
+        """Test a self-only method is a memoized property."""
+        test_obj = self.TestClass()
+        self.assertEqual(test_obj.a_property, 1)
+        self.assertEqual(test_obj.a_property, 1)
+        self.assertEqual(self.TestClass().a_property, 1)
+
+    def test_expiry(self):
+        """Test a result is recomputed once its ttl has elapsed."""
+        test_obj = self.TestClass()
+        with patch('utils.time.monotonic', return_value=100.0) as clock:
+            self.assertEqual(test_obj.a_property, 1)
+            clock.return_value = 109.0
+            self.assertEqual(test_obj.a_property, 1)
+            clock.return_value = 111.0
+            self.assertEqual(test_obj.a_property, 2)
+
+    def test_invalidate(self):
+        """Test explicit invalidation forces a recomputation."""
+        test_obj = self.TestClass()
+        test_obj.a_property
+        self.TestClass.a_property.invalidate(test_obj)
+        self.assertEqual(test_obj.a_property, 2)
+
+    def test_arguments_and_maxsize(self):
+        """Test per-argument results are bounded by maxsize (LRU)."""
+        test_obj = self.TestClass()
+        self.assertEqual(test_obj.square(2), 4)
+        self.assertEqual(test_obj.square(3), 9)
+        test_obj.square(2)
+        self.assertEqual(test_obj.calls, 2)
+        test_obj.square(4)
+        test_obj.square(2)
+        self.assertEqual(test_obj.calls, 3)
+        test_obj.square(3)
+        self.assertEqual(test_obj.calls, 4)
+
+        self.TestClass.square.invalidate(test_obj, 2)
+        test_obj.square(2)
+        self.assertEqual(test_obj.calls, 5)
+
+    def test_single_flight(self):
+        """Test concurrent readers share one computation."""
+        release = threading.Event()
+        calls = []
+
+        class Slow:
+            """Class whose property blocks until released."""
+
+            @ttl_memoize()
+            def value(self):
+                """Block, then return."""
+                calls.append(1)
+                release.wait(5)
+                return 42
+
+        test_obj = Slow()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(test_obj.value))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_errors_are_not_cached(self):
+        """Test a failing computation is retried by the next reader."""
+        outcomes = [ValueError("boom"), 7]
+
+        class Flaky:
+            """Class whose property fails once."""
+
+            @ttl_memoize()
+            def value(self):
+                """Raise or return the next outcome."""
+                outcome = outcomes.pop(0)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+
+        test_obj = Flaky()
+        with self.assertRaises(ValueError):
+            test_obj.value
+        self.assertEqual(test_obj.value, 7)
+
+
 if __name__ == "__main__":
     unittest.main()
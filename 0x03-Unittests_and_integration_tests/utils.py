@@ -1,20 +1,81 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import array
+import codecs
+import inspect
+import json
+import math
 import requests
-from functools import wraps
+import threading
+import time
+from collections import OrderedDict, abc
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from contextlib import closing
+from functools import partial, wraps
+from requests.utils import parse_header_links
+from coalesce import Coalescer
+from decoders import Decoder, loads
+from http_cache import CacheEntry, SQLiteCache
+from instrument import InstrumentedAdapter, emit, enabled, timed
+from paths import compile_path, project
+from resilience import CircuitBreaker, RetryPolicy, get_breaker
+from ratelimit import (
+    PRIORITY_ORG,
+    PRIORITY_PAGES,
+    RateLimitScheduler,
+    get_scheduler,
+)
+from urllib.parse import (
+    parse_qsl,
+    urlencode,
+    urlsplit,
+    urlunsplit,
+)
 from typing import (
     Mapping,
     Sequence,
     Any,
     Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
     Callable,
 )
 
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+Timeout = Union[float, Tuple[float, float], None]
+
 __all__ = [
     "access_nested_map",
+    "compile_path",
+    "extract_path",
+    "extract_columns",
+    "ColumnarRecords",
+    "configure_session",
+    "DEFAULT_RETRY",
+    "DEFAULT_TIMEOUT",
+    "get_session",
+    "make_session",
     "get_json",
+    "get_json_page",
+    "get_json_pages",
+    "iter_json_array",
+    "iter_json_pages",
+    "post_json",
+    "project",
+    "remaining_page_urls",
+    "with_query",
     "memoize",
+    "ttl_memoize",
 ]
 
 
@@ -40,11 +101,593 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
-def get_json(url: str) -> Dict:
+_NO_DEFAULT = object()
+_MISSING = object()
+
+
+def extract_path(
+    records: Iterable[Mapping],
+    path: Sequence,
+    default: Any = _NO_DEFAULT,
+) -> List:
+    """Value at ``path`` in each of ``records``.
+    Without ``default`` a record lacking the path raises ``KeyError`` as
+    ``access_nested_map`` would; with it, ``default`` takes its place.
+    Example
+    -------
+    >>> repos = [{"license": {"key": "mit"}}, {"license": None}]
+    >>> extract_path(repos, ("license", "key"), default=None)
+    ['mit', None]
+    """
+    getter = compile_path(path)
+    if default is _NO_DEFAULT:
+        return [getter(record) for record in records]
+    values = []
+    append = values.append
+    for record in records:
+        try:
+            append(getter(record))
+        except KeyError:
+            append(default)
+    return values
+
+
+def _to_array(values: List, missing: Any = None) -> Any:
+    """Pack one extracted column into the most compact array type.
+    Numeric columns become ``numpy`` arrays (int64, or float64 with NaN
+    where values are missing), or ``array.array`` without numpy; other
+    columns become object arrays, or lists, with ``missing`` in the gaps.
+    """
+    present = [value for value in values if value is not _MISSING]
+    gaps = len(present) != len(values)
+    numeric = bool(present) and all(
+        type(value) in (int, float) for value in present)
+
+    if numeric:
+        integral = not gaps and all(type(v) is int for v in present)
+        if integral:
+            return numpy.array(values, dtype=numpy.int64) if numpy \
+                else array.array("q", values)
+        floats = [math.nan if v is _MISSING else v for v in values]
+        return numpy.array(floats, dtype=numpy.float64) if numpy \
+            else array.array("d", floats)
+
+    filled = [missing if v is _MISSING else v for v in values]
+    if numpy is None:
+        return filled
+    column = numpy.empty(len(filled), dtype=object)
+    column[:] = filled
+    return column
+
+
+def extract_columns(
+    records: Iterable[Mapping],
+    paths: Iterable[Sequence],
+    missing: Any = None,
+) -> Dict[Tuple, Any]:
+    """Extract several key paths from many records into columns.
+    Returns one column per path, keyed by the path as a tuple. Numeric
+    columns are packed into arrays (see ``_to_array``) so statistics and
+    filters can run vectorized, e.g. with numpy installed:
+    ``stars[columns[("license", "key")] == "mit"].mean()``.
+    Example
+    -------
+    >>> repos = [{"forks": 3, "license": {"key": "mit"}}, {"forks": 5}]
+    >>> columns = extract_columns(repos, [("forks",), ("license", "key")])
+    >>> list(columns[("forks",)]), list(columns[("license", "key")])
+    ([3, 5], ['mit', None])
+    """
+    records = records if isinstance(records, abc.Sequence) \
+        else list(records)
+    return {
+        tuple(path): _to_array(
+            extract_path(records, path, default=_MISSING), missing)
+        for path in paths
+    }
+
+
+def _nest(paths: Sequence[Tuple], values: Iterable) -> Dict:
+    """Rebuild the nested map holding ``values`` at ``paths``."""
+    nested: Dict = {}
+    for path, value in zip(paths, values):
+        if value is _MISSING:
+            continue
+        target = nested
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    return nested
+
+
+class ColumnarRecords(abc.Sequence):
+    """Compact, column-per-path store of selected fields of many records.
+    Only the values at ``paths`` are kept, one list per path; indexing or
+    iterating yields small nested dicts shaped like ``project`` output.
+    Example
+    -------
+    >>> repos = [{"name": "a", "license": {"key": "mit"}, "forks": 1},
+    ...          {"name": "b", "license": None, "forks": 2}]
+    >>> records = ColumnarRecords(repos, [("name",), ("license", "key")])
+    >>> list(records)
+    [{'name': 'a', 'license': {'key': 'mit'}}, {'name': 'b'}]
+    >>> records.column(("license", "key"))
+    ['mit', None]
+    """
+    __slots__ = ("paths", "columns")
+
+    def __init__(
+        self,
+        records: Iterable[Mapping],
+        paths: Iterable[Sequence],
+    ) -> None:
+        """Init method of ColumnarRecords"""
+        self.paths = [tuple(path) for path in paths]
+        self.columns: List[List] = [[] for _ in self.paths]
+        getters = [
+            (compile_path(path), column.append)
+            for path, column in zip(self.paths, self.columns)
+        ]
+        for record in records:
+            for getter, append in getters:
+                try:
+                    append(getter(record))
+                except KeyError:
+                    append(_MISSING)
+
+    def __len__(self) -> int:
+        """Number of records."""
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """Record(s) at ``index`` as nested dicts."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return _nest(self.paths, [column[index] for column in self.columns])
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over the records as nested dicts."""
+        for values in zip(*self.columns):
+            yield _nest(self.paths, values)
+
+    def column(self, path: Sequence, default: Any = None) -> List:
+        """Values stored for ``path``, with ``default`` where missing."""
+        column = self.columns[self.paths.index(tuple(path))]
+        return [default if value is _MISSING else value for value in column]
+
+    def arrays(self, missing: Any = None) -> Dict[Tuple, Any]:
+        """Every column packed like ``extract_columns`` output."""
+        return {
+            path: _to_array(column, missing)
+            for path, column in zip(self.paths, self.columns)
+        }
+
+
+def with_query(url: str, **params: Any) -> str:
+    """Return ``url`` with the given query parameters set or replaced.
+    Example
+    -------
+    >>> with_query("https://x.io/repos?page=2", page=3, per_page=100)
+    'https://x.io/repos?page=3&per_page=100'
+    """
+    parts = urlsplit(url)
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in params
+    ]
+    query.extend((key, str(value)) for key, value in params.items())
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def make_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+) -> requests.Session:
+    """Build a keep-alive session backed by a connection pool.
+    New connections report their ``connect`` time to ``instrument`` hooks.
+    Parameters
+    ----------
+    pool_connections: int
+        number of per-host pools kept alive
+    pool_maxsize: int
+        maximum number of connections kept per host
+    pool_block: bool
+        when True, never open more than ``pool_maxsize`` connections to
+        one host and wait for a free one instead
+    """
+    session = requests.Session()
+    adapter = InstrumentedAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def configure_session(**pool_options: Any) -> requests.Session:
+    """Replace the process-wide session with one built by ``make_session``.
+    Connections held by the previous session are closed.
+    """
+    global _session
+    with _session_lock:
+        previous, _session = _session, make_session(**pool_options)
+    if previous is not None:
+        previous.close()
+    return _session
+
+
+def _parse_links(link: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Parse a raw ``Link`` header into links keyed by relation."""
+    if not link:
+        return {}
+    return {
+        item.get("rel") or item.get("url"): item
+        for item in parse_header_links(link)
+    }
+
+
+DEFAULT_TIMEOUT: Timeout = (3.05, 30.0)
+DEFAULT_RETRY = RetryPolicy()
+
+
+def _emit_response(response: requests.Response, seconds: float,
+                   host: str, streamed: bool) -> None:
+    """Report the time to first byte, download time and size of
+    ``response``, which took ``seconds`` to send and, unless
+    ``streamed``, to read.
+    """
+    elapsed = response.elapsed
+    if not isinstance(elapsed, timedelta):
+        return
+    ttfb = elapsed.total_seconds()
+    emit("ttfb", ttfb, host=host)
+    if not streamed:
+        emit("download", max(0.0, seconds - ttfb), host=host)
+        emit("bytes", len(response.content), host=host)
+
+
+def _send(
+    url: str,
+    session: requests.Session = None,
+    scheduler: RateLimitScheduler = None,
+    priority: int = PRIORITY_ORG,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+    retry: RetryPolicy = None,
+    breaker: CircuitBreaker = None,
+    method: str = "GET",
+    **kwargs: Any,
+) -> requests.Response:
+    """Send ``method`` to ``url`` once the scheduler and the host's circuit
+    breaker allow it. Rate-limit rejections are sent again once the
+    scheduler allows; connection errors, timeouts and retryable statuses
+    are retried after the delays of ``retry``. The last failure is raised,
+    as ``requests.HTTPError`` for an error status.
+    """
+    session = session or get_session()
+    scheduler = scheduler or get_scheduler()
+    retry = retry or DEFAULT_RETRY
+    breaker = breaker or get_breaker(url)
+    send = getattr(session, method.lower())
+    delays = retry.delays()
+    host = urlsplit(url).netloc
+    while True:
+        breaker.before()
+        scheduler.acquire(priority)
+        try:
+            start = time.perf_counter()
+            response = send(url, timeout=timeout, **kwargs)
+        except retry.exceptions:
+            breaker.failure()
+            delay = next(delays, None)
+            if delay is None:
+                raise
+            emit("retry", 1, host=host, reason="error")
+            time.sleep(delay)
+            continue
+        except BaseException:
+            breaker.failure()
+            raise
+        if enabled():
+            _emit_response(response, time.perf_counter() - start, host,
+                           kwargs.get("stream", False))
+
+        if scheduler.update(response):
+            breaker.success()
+            response.close()
+            continue
+        if not retry.should_retry(response):
+            breaker.success()
+            return response
+        breaker.failure()
+        delay = next(delays, None)
+        if delay is None:
+            response.raise_for_status()
+            return response
+        emit("retry", 1, host=host, reason="status")
+        response.close()
+        time.sleep(delay)
+
+
+def get_json_page(
+    url: str,
+    session: requests.Session = None,
+    cache: SQLiteCache = None,
+    coalescer: Coalescer = None,
+    decoder: Decoder = None,
+    max_age: float = None,
+    **options: Any,
+) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+    """Get JSON from remote URL together with its parsed ``Link`` header.
+    The links are keyed by relation, e.g. ``links["last"]["url"]``.
+    Requests go through ``session``, or the shared one from ``get_session``.
+    With a ``cache`` (see ``http_cache.SQLiteCache``) the stored ``ETag``
+    and ``Last-Modified`` values are sent as conditional headers and the
+    stored body is reused when the server answers 304 Not Modified.
+    With a ``coalescer`` (see ``coalesce.get_coalescer``) concurrent and
+    recent calls for the same URL, and decoder, share one fetch and its
+    result; with ``max_age`` only results fetched at most that many
+    seconds ago are reused.
+    The raw body is decoded by ``decoder``, by default the fastest JSON
+    backend installed (see ``decoders``); a ``decoders.schema_decoder``
+    keeps only the fields it names. Error statuses raise
+    ``requests.HTTPError`` instead of being decoded.
+    Other ``options``:
+    scheduler: RateLimitScheduler
+        paces the request, by default ``ratelimit.get_scheduler()``
+    priority: int
+        place in the scheduler's queue, ``PRIORITY_ORG`` by default
+    timeout: float or (connect, read) tuple
+        ``DEFAULT_TIMEOUT`` by default
+    retry: RetryPolicy
+        retries of transient failures, ``DEFAULT_RETRY`` by default
+    breaker: CircuitBreaker
+        by default the one shared by every call to the same host
+    """
+    if coalescer is not None:
+        key = url if decoder is None else (url, decoder)
+        return coalescer.get(key, partial(
+            get_json_page, url, session, cache, decoder=decoder, **options),
+            max_age)
+    decode = decoder or loads
+    host = urlsplit(url).netloc
+
+    entry = cache.get(url) if cache is not None else None
+    if entry is None:
+        response = _send(url, session, **options)
+    else:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        response = _send(url, session, headers=headers, **options)
+        if response.status_code == 304:
+            with timed("decode", host=host):
+                payload = decode(entry.body)
+            return payload, _parse_links(entry.link)
+
+    response.raise_for_status()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if cache is not None and response.ok and (etag or last_modified):
+        cache.set(url, CacheEntry(
+            response.content, etag, last_modified,
+            response.headers.get("Link"),
+        ))
+    with timed("decode", host=host):
+        payload = decode(response.content)
+    return payload, response.links
+
+
+def get_json(
+    url: str,
+    session: requests.Session = None,
+    cache: SQLiteCache = None,
+    coalescer: Coalescer = None,
+    **options: Any,
+) -> Dict:
     """Get JSON from remote URL.
+    ``options`` are those of ``get_json_page``.
     """
-    response = requests.get(url)
-    return response.json()
+    return get_json_page(url, session, cache, coalescer, **options)[0]
+
+
+def post_json(
+    url: str,
+    payload: Any,
+    session: requests.Session = None,
+    decoder: Decoder = None,
+    **options: Any,
+) -> Any:
+    """POST ``payload`` as JSON to remote URL and return the JSON answer.
+    ``options`` are those of ``get_json_page``, except ``cache``, plus
+    ``headers`` to send with the request.
+    """
+    response = _send(url, session, method="POST", json=payload, **options)
+    return (decoder or loads)(response.content)
+
+
+def _page_number(url: str) -> int:
+    """Page number carried by the ``page`` query parameter of ``url``."""
+    return int(dict(parse_qsl(urlsplit(url).query)).get("page", 1))
+
+
+def remaining_page_urls(links: Dict[str, Dict[str, str]]) -> List[str]:
+    """URLs of pages 2..last announced by a first page's ``rel="last"`` link.
+    Example
+    -------
+    >>> remaining_page_urls({"last": {"url": "https://x.io/r?page=3"}})
+    ['https://x.io/r?page=2', 'https://x.io/r?page=3']
+    """
+    last_url = links["last"]["url"]
+    return [
+        with_query(last_url, page=page)
+        for page in range(2, _page_number(last_url) + 1)
+    ]
+
+
+def _list_page(page: Any, url: str) -> List:
+    """``page`` itself, checked to be a list as pages of a listing are."""
+    if not isinstance(page, list):
+        raise ValueError("expected a JSON list from {}, got {}".format(
+            url, type(page).__name__))
+    return page
+
+
+def get_json_pages(
+    url: str,
+    per_page: int = None,
+    max_workers: int = 8,
+    **options: Any,
+) -> List:
+    """Get every page of a ``Link``-paginated JSON list.
+    The first page tells us the last page number; the remaining pages
+    are then fetched concurrently on at most ``max_workers`` threads and
+    concatenated in page order. When the server only advertises a
+    ``next`` link, pages are followed one after another instead.
+    ``options`` are those of ``get_json_page``; pages are scheduled at
+    ``PRIORITY_PAGES``. A page that fails or is not a list raises, so a
+    partial listing is never returned.
+    """
+    if per_page is not None:
+        url = with_query(url, per_page=per_page)
+    options.setdefault("priority", PRIORITY_PAGES)
+    fetch_page = partial(get_json_page, **options)
+    payload, links = fetch_page(url)
+    payload = list(_list_page(payload, url))
+
+    if "last" in links:
+        urls = remaining_page_urls(links)
+        if urls:
+            workers = max(1, min(max_workers, len(urls)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for page_url, (page, _) in zip(
+                        urls, executor.map(fetch_page, urls)):
+                    payload.extend(_list_page(page, page_url))
+        return payload
+
+    while "next" in links:
+        page_url = links["next"]["url"]
+        page, links = fetch_page(page_url)
+        payload.extend(_list_page(page, page_url))
+    return payload
+
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Incrementally decode the items of a top-level JSON array.
+    ``chunks`` is any iterable of UTF-8 encoded byte strings, such as
+    ``response.iter_content()``; only the item being decoded is buffered.
+    Anything but a single well-formed array raises ``ValueError``.
+    Example
+    -------
+    >>> list(iter_json_array([b'[{"a": 1},', b' {"a"', b': 2}, 3', b']']))
+    [{'a': 1}, {'a': 2}, 3]
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer, pos, eof = "", 0, False
+    # What may come next: "[", an item or "]", an item, "," or "]", or
+    # nothing but whitespace once the array is closed.
+    expect = "array"
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == "array":
+                if char != "[":
+                    raise ValueError("expected a JSON array")
+                expect, pos = "first", pos + 1
+                continue
+            if expect == "end":
+                raise ValueError("extra data after the JSON array")
+            if char == "]" and expect != "item":
+                expect, pos = "end", pos + 1
+                continue
+            if expect == "delimiter":
+                if char != ",":
+                    raise ValueError("expected ',' or ']' after an item")
+                expect, pos = "item", pos + 1
+                continue
+            if char in ",]":
+                raise ValueError("expected a JSON value")
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number such as "12" or "8e" may continue in the next
+                # chunk, so an item only counts once a delimiter follows.
+                if eof or end < len(buffer) and buffer[end] in _DELIMITERS:
+                    yield item
+                    expect, pos = "delimiter", end
+                    continue
+        elif eof:
+            if expect == "end":
+                return
+            raise ValueError("unterminated JSON array")
+
+        chunk = next(chunks, None)
+        eof = chunk is None
+        buffer = buffer[pos:] + text.decode(chunk or b"", final=eof)
+        pos = 0
+
+
+def iter_json_pages(
+    url: str,
+    per_page: int = None,
+    fields: Iterable[Sequence] = None,
+    chunk_size: int = 64 * 1024,
+    **options: Any,
+) -> Iterator[Any]:
+    """Stream the items of every page of a ``Link``-paginated JSON list.
+    Pages are fetched one after another and parsed while they download,
+    so memory stays bounded by one item rather than one listing. With
+    ``fields`` each item is reduced by ``project`` before being yielded.
+    ``options`` are those of ``get_json_page`` except ``cache``.
+    """
+    if per_page is not None:
+        url = with_query(url, per_page=per_page)
+    fields = None if fields is None else list(fields)
+    options.setdefault("priority", PRIORITY_PAGES)
+
+    while url:
+        response = _send(url, stream=True, **options)
+        with closing(response):
+            response.raise_for_status()
+            next_url = response.links.get("next", {}).get("url")
+            for item in iter_json_array(response.iter_content(chunk_size)):
+                yield item if fields is None else project(item, fields)
+        url = next_url
 
 
 def memoize(fn: Callable) -> Callable:
@@ -69,7 +712,144 @@ def memoize(fn: Callable) -> Callable:
     def memoized(self):
         """"memoized wraps"""
         if not hasattr(self, attr_name):
+            emit("memoize.miss", 1, name=fn.__qualname__)
             setattr(self, attr_name, fn(self))
+        else:
+            emit("memoize.hit", 1, name=fn.__qualname__)
         return getattr(self, attr_name)
 
     return property(memoized)
+
+
+class _MemoStore:
+    """Per-instance results of one ``ttl_memoize`` method."""
+    __slots__ = ("lock", "entries", "inflight")
+
+    def __init__(self) -> None:
+        """Init method of _MemoStore"""
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()
+        self.inflight: Dict[Any, Future] = {}
+
+
+class _TTLMemoized:
+    """Descriptor built by ``ttl_memoize``."""
+
+    def __init__(
+        self,
+        fn: Callable,
+        ttl: Union[float, Callable[[Any], Optional[float]], None],
+        maxsize: Optional[int],
+    ) -> None:
+        """Init method of _TTLMemoized"""
+        wraps(fn)(self)
+        self.fn = fn
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.is_property = len(inspect.signature(fn).parameters) == 1
+        self.attr_name = "_{}_memo".format(fn.__name__)
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        """Return the memoized value, or a memoizing bound method."""
+        if instance is None:
+            return self
+        if self.is_property:
+            return self._lookup(instance, (), {})
+        return wraps(self.fn)(partial(self._call, instance))
+
+    def _call(self, instance: Any, *args: Any, **kwargs: Any) -> Any:
+        """Memoized call of the wrapped method."""
+        return self._lookup(instance, args, kwargs)
+
+    def _store(self, instance: Any) -> _MemoStore:
+        """The store kept on ``instance``, created on first use."""
+        return instance.__dict__.setdefault(self.attr_name, _MemoStore())
+
+    def _lookup(self, instance: Any, args: tuple, kwargs: dict) -> Any:
+        """Return a fresh stored result, or compute it exactly once."""
+        key = (args, frozenset(kwargs.items())) if args or kwargs else ()
+        store = self._store(instance)
+        with store.lock:
+            entry = store.entries.get(key)
+            fresh = entry is not None and (
+                entry[1] is None or entry[1] > time.monotonic())
+            if fresh:
+                store.entries.move_to_end(key)
+            else:
+                flight = store.inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = store.inflight[key] = Future()
+        if fresh:
+            emit("memoize.hit", 1, name=self.__qualname__)
+            return entry[0]
+        if not leader:
+            emit("memoize.hit", 1, name=self.__qualname__)
+            return flight.result()
+        emit("memoize.miss", 1, name=self.__qualname__)
+
+        try:
+            value = self.fn(instance, *args, **kwargs)
+        except BaseException as error:
+            with store.lock:
+                del store.inflight[key]
+            flight.set_exception(error)
+            raise
+
+        ttl = self.ttl(instance) if callable(self.ttl) else self.ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with store.lock:
+            store.entries[key] = (value, expires)
+            store.entries.move_to_end(key)
+            while self.maxsize is not None and \
+                    len(store.entries) > self.maxsize:
+                store.entries.popitem(last=False)
+            del store.inflight[key]
+        flight.set_result(value)
+        return value
+
+    def invalidate(self, instance: Any, *args: Any, **kwargs: Any) -> None:
+        """Forget the result stored on ``instance`` for these arguments,
+        or every result stored on ``instance`` when none are given.
+        """
+        store = self._store(instance)
+        with store.lock:
+            if args or kwargs:
+                store.entries.pop((args, frozenset(kwargs.items())), None)
+            else:
+                store.entries.clear()
+
+
+def ttl_memoize(
+    ttl: Union[float, Callable[[Any], Optional[float]], None] = None,
+    maxsize: Optional[int] = 128,
+) -> Callable[[Callable], _TTLMemoized]:
+    """Decorator to memoize a method with expiry and single-flight locking.
+    A method taking only ``self`` becomes a property, like ``memoize``;
+    other methods cache one result per argument tuple, keeping at most
+    ``maxsize`` of them. ``ttl`` is a number of seconds, or a callable
+    that returns it for a given instance; ``None`` never expires.
+    Concurrent readers of a missing entry wait for a single computation.
+    Example
+    -------
+    class MyClass:
+        @ttl_memoize(ttl=60)
+        def a_method(self):
+            print("a_method called")
+            return 42
+    >>> my_object = MyClass()
+    >>> my_object.a_method
+    a_method called
+    42
+    >>> my_object.a_method
+    42
+    >>> MyClass.a_method.invalidate(my_object)
+    >>> my_object.a_method
+    a_method called
+    42
+    """
+    def decorator(fn: Callable) -> _TTLMemoized:
+        """Wrap ``fn`` in a memoizing descriptor."""
+        return _TTLMemoized(fn, ttl, maxsize)
+
+    return decorator